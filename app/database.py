@@ -2,19 +2,63 @@ from __future__ import annotations
 
 import os
 import warnings
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterator
 
-from sqlalchemy import inspect
+from sqlalchemy import event, inspect
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session, SQLModel, create_engine
 
+from app.speedups import orjson
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DEFAULT_DB_PATH = BASE_DIR / "data" / "rinblog.db"
 DATABASE_PATH = Path(os.getenv("RINBLOG_DB_PATH", str(DEFAULT_DB_PATH))).expanduser()
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False, "timeout": 30},
+    poolclass=QueuePool,
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    **(
+        {"json_serializer": lambda value: orjson.dumps(value).decode(), "json_deserializer": orjson.loads}
+        if orjson is not None
+        else {}
+    ),
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    """Apply WAL journaling and cache tuning to every new pooled connection."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+
+@lru_cache(maxsize=4)
+def _schema_fingerprint(mtime_ns: int) -> tuple[bool, bool, bool]:
+    """Return (has_comment, has_image_url, has_image_urls) for the database file.
+
+    ``mtime_ns`` only serves as the cache key so the inspection reruns
+    whenever the database file changes on disk.
+    """
+    inspector = inspect(engine)
+    if "comment" not in inspector.get_table_names():
+        return False, False, False
+
+    columns = {col["name"] for col in inspector.get_columns("comment")}
+    return True, "image_url" in columns, "image_urls" in columns
 
 
 def check_schema_compatibility() -> None:
@@ -22,14 +66,12 @@ def check_schema_compatibility() -> None:
     if not DATABASE_PATH.exists():
         return
     
-    inspector = inspect(engine)
-    if "comment" not in inspector.get_table_names():
+    has_comment, has_image_url, has_image_urls = _schema_fingerprint(DATABASE_PATH.stat().st_mtime_ns)
+    if not has_comment:
         return
     
-    columns = {col["name"]: col for col in inspector.get_columns("comment")}
-    
     # Check if old schema exists (has image_url but not image_urls)
-    if "image_url" in columns and "image_urls" not in columns:
+    if has_image_url and not has_image_urls:
         warnings.warn(
             "Database schema is outdated. The 'image_url' column needs to be migrated to 'image_urls'. "
             "Please delete the database file to recreate it with the new schema, or run a migration script. "
@@ -41,11 +83,16 @@ def check_schema_compatibility() -> None:
 def init_db() -> None:
     DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
     SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist, so add indexes introduced later
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
     check_schema_compatibility()
 
 
 def get_session() -> Iterator[Session]:
-    with Session(engine) as session:
+    # Keep committed objects loaded so freshly inserted rows are not re-SELECTed
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
 
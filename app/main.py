@@ -1,17 +1,22 @@
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 
 from .database import init_db
 from .routers import comments, pages
 from .services import markdown_loader, tag_collections
+from .speedups import orjson
+from .staticfiles import CachedStaticFiles
+from .templating import preload_templates
 
 
-app = FastAPI(title="RinBlog")
+DEFAULT_RESPONSE_CLASS = ORJSONResponse if orjson is not None else JSONResponse
+
+app = FastAPI(title="RinBlog", default_response_class=DEFAULT_RESPONSE_CLASS)
 
 app.include_router(pages.router)
 app.include_router(comments.router)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static"), name="static")
 
 
 @app.on_event("startup")
@@ -19,10 +24,15 @@ def startup() -> None:
     init_db()
     markdown_loader.refresh_cache()
     tag_collections.refresh()
+    preload_templates()
+
+
+# Liveness probes hit this often; serve a prebuilt body instead of serialising a dict
+_HEALTH_RESPONSE = Response(content=b'{"status":"ok"}', media_type="application/json")
 
 
 @app.get("/health")
-async def healthcheck() -> dict[str, str]:
-    return {"status": "ok"}
+async def healthcheck() -> Response:
+    return _HEALTH_RESPONSE
 
 
@@ -5,16 +5,23 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import JSON, Column
+from sqlalchemy import JSON, CheckConstraint, Column, Index
 from sqlmodel import Field, SQLModel
 
 
 class Comment(SQLModel, table=True):
+    __table_args__ = (
+        # Serves "WHERE post_slug = ? ORDER BY created_at" without a sort step
+        Index("ix_comment_slug_created", "post_slug", "created_at"),
+        CheckConstraint("length(content) BETWEEN 1 AND 1000", name="ck_comment_content_length"),
+        CheckConstraint("nickname IS NULL OR length(nickname) <= 50", name="ck_comment_nickname_length"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    post_slug: str = Field(index=True, max_length=200)
+    post_slug: str = Field(max_length=200)
     nickname: Optional[str] = Field(default=None, max_length=50)
     content: str = Field(min_length=1, max_length=1000)
-    image_urls: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+    image_urls: Optional[List[str]] = Field(default=None, sa_column=Column(JSON, nullable=True))
     parent_id: Optional[int] = Field(default=None, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -32,20 +39,21 @@ class CommentView:
     def from_model(cls, comment: Comment) -> "CommentView":
         nickname = comment.nickname.strip() if comment.nickname else ""
         display_name = nickname or "Anonymous"
-        display_time = comment.created_at.strftime("%Y-%m-%d %H:%M")
+        created = comment.created_at
+        display_time = f"{created.year:04d}-{created.month:02d}-{created.day:02d} {created.hour:02d}:{created.minute:02d}"
         
-        # Parse image_urls from JSON string or list
+        # The JSON column already yields a list; only legacy rows hold a raw string
+        urls = comment.image_urls
         image_urls = []
-        if comment.image_urls:
-            if isinstance(comment.image_urls, str):
+        if urls:
+            if isinstance(urls, list):
+                image_urls = urls
+            elif isinstance(urls, str):
                 try:
-                    image_urls = json.loads(comment.image_urls)
+                    image_urls = json.loads(urls)
                 except (json.JSONDecodeError, TypeError):
                     # Fallback: treat as single URL (backward compatibility)
-                    if comment.image_urls:
-                        image_urls = [comment.image_urls]
-            elif isinstance(comment.image_urls, list):
-                image_urls = comment.image_urls
+                    image_urls = [urls]
         
         return cls(
             comment_id=comment.id or 0,
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 @dataclass(slots=True)
@@ -18,6 +18,7 @@ class BlogPost:
     group_label: Optional[str] = None
     group_description: Optional[str] = None
     tags: List[str] = field(default_factory=list)
+    tags_lower: Tuple[str, ...] = ()
     is_daily: bool = False
     lang: str = "en"
     column: Optional[str] = None
@@ -1,14 +1,30 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from sqlalchemy.orm import load_only
 from sqlmodel import Session, select
 
 from app.models.comment import Comment
 
 
 def list_comments(session: Session, slug: str) -> List[Comment]:
-    statement = select(Comment).where(Comment.post_slug == slug).order_by(Comment.created_at.asc())
+    # post_slug is already known to the caller, so leave it out of the row
+    statement = (
+        select(Comment)
+        .options(
+            load_only(
+                Comment.id,
+                Comment.nickname,
+                Comment.content,
+                Comment.image_urls,
+                Comment.parent_id,
+                Comment.created_at,
+            )
+        )
+        .where(Comment.post_slug == slug)
+        .order_by(Comment.created_at.asc())
+    )
     return list(session.exec(statement))
 
 
@@ -30,7 +46,16 @@ def create_comment(
     )
     session.add(comment)
     session.commit()
-    session.refresh(comment)
     return comment
 
 
+def create_comments_bulk(session: Session, items: Iterable[Dict[str, Any]]) -> List[Comment]:
+    """Insert several comments in one transaction; each item holds Comment field values.
+
+    The returned comments only skip a SELECT per row when the session was opened with
+    ``expire_on_commit=False`` (as ``get_session`` does); otherwise each one is reloaded on first access.
+    """
+    comments = [Comment(**item) for item in items]
+    session.add_all(comments)
+    session.commit()
+    return comments
@@ -2,16 +2,15 @@ from __future__ import annotations
 
 from fastapi import APIRouter, Depends, Form, File, UploadFile, HTTPException, Request, status
 from fastapi.responses import RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlmodel import Session
 from typing import List, Optional
 
 from app.database import get_session
 from app.services import comment_service, markdown_loader
+from app.templating import templates
 
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
 
 
 @router.post("/posts/{slug}/comments", name="create_comment", response_model=None)
@@ -28,13 +27,9 @@ def create_comment(
     if post is None:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    # Convert empty string or None to None, then to int if valid
-    parent_id_int = None
-    if parent_id and parent_id.strip():
-        try:
-            parent_id_int = int(parent_id.strip())
-        except (ValueError, TypeError):
-            parent_id_int = None
+    # Empty, negative or non-numeric parent ids mean a top-level comment
+    raw_parent_id = (parent_id or "").strip()
+    parent_id_int = int(raw_parent_id) if raw_parent_id.isdecimal() else None
 
     try:
         comment_service.create_comment(
@@ -46,7 +41,7 @@ def create_comment(
             parent_id=parent_id_int
         )
     except ValueError as exc:
-        comments = comment_service.list_comment_views(session, slug)
+        comments = comment_service.list_comment_tree(session, slug)
         return templates.TemplateResponse(
             "post_detail.html",
             {
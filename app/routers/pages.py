@@ -1,21 +1,55 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, StreamingResponse
 from sqlmodel import Session
 
-from typing import List, Optional
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
 
 from fastapi import Query
 
 from app.database import get_session
-from app.models.post import BlogPost
 from app.services import markdown_loader, tag_collections
 from app.services import comment_service, i18n
-from app.services.tag_collections import TagCollection, _read_collections_file
+from app.templating import DEBUG, stream_template, templates
 
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
+
+HTML_CACHE_LIMIT = 256  # rendered pages kept per endpoint
+
+
+def cached_html(endpoint: Callable[..., HTMLResponse]) -> Callable[..., HTMLResponse]:
+    """Reuse an endpoint's rendered page until posts or tag collections are reloaded or edited.
+
+    Only for pages that depend on nothing but markdown content, the URL and ``lang``.
+    With ``RINBLOG_DEBUG`` set every request is rendered, so template edits show up at once.
+    """
+    cache: Dict[Tuple[str, str, str], bytes] = {}
+    cached_version: Optional[Tuple[int, int]] = None
+
+    @wraps(endpoint)
+    def wrapper(**kwargs) -> HTMLResponse:
+        nonlocal cached_version
+        if DEBUG:
+            return endpoint(**kwargs)
+        version = (markdown_loader.cache_version(), tag_collections.cache_version())
+        if version != cached_version:
+            cache.clear()
+            cached_version = version
+
+        request: Request = kwargs["request"]
+        key = (str(request.base_url), request.url.path, kwargs["lang"])
+        body = cache.get(key)
+        if body is not None:
+            return HTMLResponse(body)
+
+        response = endpoint(**kwargs)
+        if len(cache) >= HTML_CACHE_LIMIT:
+            cache.clear()
+        cache[key] = response.body
+        return response
+
+    return wrapper
 
 
 def get_language(lang: Optional[str] = Query(None, alias="lang")) -> str:
@@ -24,16 +58,16 @@ def get_language(lang: Optional[str] = Query(None, alias="lang")) -> str:
 
 
 @router.get("/", response_class=HTMLResponse, name="homepage")
+@cached_html
 def homepage(request: Request, lang: str = Depends(get_language)) -> HTMLResponse:
-    all_posts = markdown_loader.list_posts(include_daily=False)
-    posts = markdown_loader.filter_by_language(all_posts, lang)
+    posts = markdown_loader.list_posts(include_daily=False, lang=lang)
     groups = markdown_loader.list_groups()
     all_daily = markdown_loader.list_daily_posts()
     latest_daily = next((p for p in all_daily if p.lang == lang), None) or (all_daily[0] if all_daily else None)
     columns = markdown_loader.list_columns()
 
     posts_with_badges = [
-        (post, tag_collections.build_badges(post.tags))
+        (post, tag_collections.build_badges(post.tags, post.tags_lower))
         for post in posts
     ]
     return templates.TemplateResponse(
@@ -53,6 +87,7 @@ def homepage(request: Request, lang: str = Depends(get_language)) -> HTMLRespons
 
 
 @router.get("/groups/{group_slug}", response_class=HTMLResponse, name="group_posts")
+@cached_html
 def group_posts(request: Request, group_slug: str, lang: str = Depends(get_language)) -> HTMLResponse:
     group = markdown_loader.get_group_by_slug(group_slug)
     if group is None:
@@ -60,7 +95,7 @@ def group_posts(request: Request, group_slug: str, lang: str = Depends(get_langu
     all_posts = markdown_loader.list_posts_by_group(group_slug)
     posts = markdown_loader.filter_by_language(all_posts, lang)
     posts_badges = [
-        (post, tag_collections.build_badges(post.tags))
+        (post, tag_collections.build_badges(post.tags, post.tags_lower))
         for post in posts
     ]
     return templates.TemplateResponse(
@@ -83,14 +118,14 @@ def post_detail(
     slug: str,
     session: Session = Depends(get_session),
     lang: str = Depends(get_language),
-) -> HTMLResponse:
+) -> StreamingResponse:
     post = markdown_loader.get_post(slug)
     if post is None:
         raise HTTPException(status_code=404, detail="Post not found")
 
-    comments = comment_service.list_comment_views(session, slug)
-    tag_badges = tag_collections.build_badges(post.tags)
-    return templates.TemplateResponse(
+    comments = comment_service.list_comment_tree(session, slug)
+    tag_badges = tag_collections.build_badges(post.tags, post.tags_lower)
+    return stream_template(
         "post_detail.html",
         {
             "request": request,
@@ -107,11 +142,11 @@ def post_detail(
 
 
 @router.get("/daily", response_class=HTMLResponse, name="daily_posts")
+@cached_html
 def daily_posts(request: Request, lang: str = Depends(get_language)) -> HTMLResponse:
-    all_posts = markdown_loader.list_daily_posts()
-    posts = markdown_loader.filter_by_language(all_posts, lang)
+    posts = markdown_loader.list_daily_posts(lang=lang)
     posts_with_badges = [
-        (post, tag_collections.build_badges(post.tags))
+        (post, tag_collections.build_badges(post.tags, post.tags_lower))
         for post in posts
     ]
     return templates.TemplateResponse(
@@ -128,44 +163,17 @@ def daily_posts(request: Request, lang: str = Depends(get_language)) -> HTMLResp
 
 
 @router.get("/collections/{collection_slug}", response_class=HTMLResponse, name="collection_posts")
+@cached_html
 def collection_posts(request: Request, collection_slug: str, lang: str = Depends(get_language)) -> HTMLResponse:
-    collections_data = _read_collections_file()
-    collection_info: Optional[TagCollection] = None
-    matching_tags: List[str] = []
-    
-    for entry in collections_data:
-        slug = str(entry.get("slug") or "").strip() or str(entry.get("name") or "").lower().replace(" ", "-")
-        if slug == collection_slug:
-            name = str(entry.get("name") or "").strip()
-            if name:
-                color = entry.get("color")
-                if isinstance(color, str):
-                    color = color.strip() or None
-                description = entry.get("description")
-                if isinstance(description, str):
-                    description = description.strip() or None
-                collection_info = TagCollection(slug=slug, name=name, description=description, color=color)
-                tags = entry.get("tags") or []
-                if isinstance(tags, str):
-                    tags = [tags]
-                matching_tags = [str(t).strip() for t in tags if isinstance(t, str) and t.strip()]
-            break
-    
-    if collection_info is None:
+    info_tags = tag_collections.get_collection(collection_slug)
+    if info_tags is None:
         raise HTTPException(status_code=404, detail="Collection not found")
-    
-    all_matching_posts: List[BlogPost] = []
-    seen_slugs = set()
-    for tag in matching_tags:
-        for post in markdown_loader.list_posts_by_tag(tag):
-            if post.slug not in seen_slugs:
-                all_matching_posts.append(post)
-                seen_slugs.add(post.slug)
-    
-    all_matching_posts.sort(key=lambda p: p.date, reverse=True)
+    collection_info, matching_tags = info_tags
+
+    all_matching_posts = markdown_loader.list_posts_by_tags(matching_tags)
     posts = markdown_loader.filter_by_language(all_matching_posts, lang)
     posts_with_badges = [
-        (post, tag_collections.build_badges(post.tags))
+        (post, tag_collections.build_badges(post.tags, post.tags_lower))
         for post in posts
     ]
     
@@ -196,7 +204,7 @@ def tag_posts(
     all_posts = markdown_loader.list_posts_by_tag(normalized_tag)
     posts = markdown_loader.filter_by_language(all_posts, lang)
     posts_badges = [
-        (post, tag_collections.build_badges(post.tags))
+        (post, tag_collections.build_badges(post.tags, post.tags_lower))
         for post in posts
     ]
 
@@ -215,6 +223,7 @@ def tag_posts(
 
 
 @router.get("/columns/{column}", response_class=HTMLResponse, name="column_posts")
+@cached_html
 def column_posts(request: Request, column: str, lang: str = Depends(get_language)) -> HTMLResponse:
     """List posts in a column."""
     all_posts = markdown_loader.list_posts_by_column(column)
@@ -222,7 +231,7 @@ def column_posts(request: Request, column: str, lang: str = Depends(get_language
     subcolumns = markdown_loader.list_subcolumns(column)
     
     posts_with_badges = [
-        (post, tag_collections.build_badges(post.tags))
+        (post, tag_collections.build_badges(post.tags, post.tags_lower))
         for post in posts
     ]
     
@@ -242,13 +251,14 @@ def column_posts(request: Request, column: str, lang: str = Depends(get_language
 
 
 @router.get("/columns/{column}/{subcolumn}", response_class=HTMLResponse, name="subcolumn_posts")
+@cached_html
 def subcolumn_posts(request: Request, column: str, subcolumn: str, lang: str = Depends(get_language)) -> HTMLResponse:
     """List posts in a subcolumn."""
     all_posts = markdown_loader.list_posts_by_column(column, subcolumn)
     posts = markdown_loader.filter_by_language(all_posts, lang)
     
     posts_with_badges = [
-        (post, tag_collections.build_badges(post.tags))
+        (post, tag_collections.build_badges(post.tags, post.tags_lower))
         for post in posts
     ]
     
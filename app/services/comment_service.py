@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import os
+import secrets
 import shutil
-import uuid
+from collections import defaultdict
 from pathlib import Path
-from typing import List, Optional, Any
+from typing import Any, DefaultDict, List, Optional
 
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session
 
 from app.models.comment import CommentView
@@ -13,27 +16,32 @@ from app.repositories import comments as comment_repo
 
 MAX_CONTENT_LENGTH = 1000
 MAX_NICKNAME_LENGTH = 50
+STRIP_ALLOWANCE = 1024  # surrounding whitespace tolerated before the length pre-check rejects input
 UPLOAD_DIR = Path("static/uploads/comments")
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # copyfileobj's 64 KiB default means many small writes for photos
 
 
-def list_comment_views(session: Session, slug: str) -> List[CommentView]:
+def list_comment_tree(session: Session, slug: str) -> List[CommentView]:
+    """Load all comments of a post in one query and nest replies under their parents."""
     records = comment_repo.list_comments(session, slug)
-    # Convert all to views first
-    all_views = [CommentView.from_model(record) for record in records]
-    
-    # Build a map of id -> view
-    view_map = {view.comment_id: view for view in all_views}
-    
-    # Separate roots and children
-    roots = []
-    for record, view in zip(records, all_views):
-        if record.parent_id and record.parent_id in view_map:
-            parent = view_map[record.parent_id]
-            parent.children.append(view)
-        else:
-            roots.append(view)
-            
-    return roots
+    entries = []
+    children: DefaultDict[int, List[CommentView]] = defaultdict(list)
+    for record in records:
+        view = CommentView.from_model(record)
+        entries.append((view, record.parent_id))
+        if record.parent_id:
+            children[record.parent_id].append(view)
+
+    # Attach replies regardless of row order; replies to missing parents stay top-level
+    ids = set()
+    for view, _ in entries:
+        ids.add(view.comment_id)
+        if view.comment_id in children:
+            view.children = children[view.comment_id]
+    return [view for view, parent_id in entries if not parent_id or parent_id not in ids]
+
+
+list_comment_views = list_comment_tree
 
 
 def save_upload_file(upload_file: Any) -> Optional[str]:
@@ -53,7 +61,7 @@ def save_upload_file(upload_file: Any) -> Optional[str]:
     if not ext:
         ext = ".jpg" # default fallback
         
-    unique_name = f"{uuid.uuid4().hex}{ext}"
+    unique_name = f"{secrets.token_hex(16)}{ext}"
     file_path = UPLOAD_DIR / unique_name
     
     # Save file
@@ -62,7 +70,7 @@ def save_upload_file(upload_file: Any) -> Optional[str]:
     # For UploadFile, we can use .file.read() or .file object.
     try:
         with file_path.open("wb") as buffer:
-            shutil.copyfileobj(upload_file.file, buffer)
+            _copy_upload(upload_file.file, buffer)
     finally:
         upload_file.file.close()
         
@@ -71,6 +79,31 @@ def save_upload_file(upload_file: Any) -> Optional[str]:
     return f"/static/uploads/comments/{unique_name}"
 
 
+def _copy_upload(source: Any, target: Any) -> None:
+    """Copy an upload into ``target``, in the kernel when the upload already lives on disk."""
+    # Calling fileno() on a SpooledTemporaryFile still held in memory would force it to disk first
+    if hasattr(os, "sendfile") and getattr(source, "_rolled", False):
+        try:
+            source.flush()
+            target.flush()
+            src_fd, dst_fd = source.fileno(), target.fileno()
+            offset = source.tell()
+            remaining = os.fstat(src_fd).st_size - offset
+            while remaining > 0:
+                sent = os.sendfile(dst_fd, src_fd, offset, remaining)
+                if sent == 0:
+                    break
+                offset += sent
+                remaining -= sent
+            source.seek(offset)
+            return
+        except (AttributeError, OSError, ValueError):
+            # Not a real file, or sendfile can't copy between these fds; rewind what we wrote
+            target.seek(0)
+            target.truncate()
+    shutil.copyfileobj(source, target, length=UPLOAD_CHUNK_SIZE)
+
+
 def create_comment(
     session: Session, 
     slug: str, 
@@ -79,8 +112,18 @@ def create_comment(
     images: Optional[List[Any]] = None,
     parent_id: Optional[int] = None
 ) -> CommentView:
-    safe_nickname = (nickname or "").strip()
-    safe_content = (content or "").strip()
+    raw_nickname = nickname or ""
+    raw_content = content or ""
+
+    # Inputs this far over the limit can't strip down to a valid size; reject before copying them
+    if len(raw_content) > MAX_CONTENT_LENGTH + STRIP_ALLOWANCE:
+        raise ValueError("Comment is too long.")
+
+    if len(raw_nickname) > MAX_NICKNAME_LENGTH + STRIP_ALLOWANCE:
+        raise ValueError("Nickname is too long.")
+
+    safe_nickname = raw_nickname.strip()
+    safe_content = raw_content.strip()
 
     if not safe_content:
         raise ValueError("Comment cannot be empty.")
@@ -91,27 +134,34 @@ def create_comment(
     if safe_nickname and len(safe_nickname) > MAX_NICKNAME_LENGTH:
         raise ValueError("Nickname is too long.")
 
+    uploads = [image for image in images or [] if image and image.filename]
+    # Validate every image (basic check) before writing any, so a bad file leaves nothing behind
+    for image in uploads:
+        if not image.content_type.startswith(("image/", "application/octet-stream")):
+            raise ValueError("Invalid file type. Only images are allowed.")
+
     image_urls = []
-    if images:
-        for image in images:
-            if not image or not image.filename:
-                continue
-            # Validate image (basic check)
-            if not image.content_type.startswith(("image/", "application/octet-stream")):
-                raise ValueError("Invalid file type. Only images are allowed.")
-            
-            image_url = save_upload_file(image)
-            if image_url:
-                image_urls.append(image_url)
-
-    record = comment_repo.create_comment(
-        session,
-        slug=slug,
-        nickname=safe_nickname or None,
-        content=safe_content,
-        image_urls=image_urls if image_urls else None,
-        parent_id=parent_id,
-    )
+    for image in uploads:
+        image_url = save_upload_file(image)
+        if image_url:
+            image_urls.append(image_url)
+
+    try:
+        record = comment_repo.create_comment(
+            session,
+            slug=slug,
+            nickname=safe_nickname or None,
+            content=safe_content,
+            image_urls=image_urls if image_urls else None,
+            parent_id=parent_id,
+        )
+    except IntegrityError as exc:
+        session.rollback()
+        if "ck_comment_nickname_length" in str(exc.orig):
+            raise ValueError("Nickname is too long.") from exc
+        if "ck_comment_content_length" in str(exc.orig):
+            raise ValueError("Comment is too long.") from exc
+        raise
     return CommentView.from_model(record)
 
 
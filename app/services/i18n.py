@@ -12,7 +12,7 @@ def normalize_lang(lang: str | None) -> LanguageCode:
     """Normalize language code to supported value."""
     if not lang:
         return DEFAULT_LANGUAGE
-    normalized = lang.lower().strip()[:2]
+    normalized = lang.strip()[:2].lower()
     if normalized in SUPPORTED_LANGUAGES:
         return normalized  # type: ignore
     return DEFAULT_LANGUAGE
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
 import re
 import html
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
 from datetime import date, datetime
+from itertools import islice
+from operator import attrgetter
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-import frontmatter
+import yaml
 from markdown_it import MarkdownIt
 from mdit_py_plugins.tasklists import tasklists_plugin
 
@@ -18,39 +26,123 @@ logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 CONTENT_DIR = BASE_DIR / "content"
-
-_markdown = MarkdownIt("commonmark", {"html": True}).enable("table").enable("strikethrough").enable("fence")
-_markdown.use(tasklists_plugin)
+POST_CACHE_PATH = Path(os.getenv("RINBLOG_CACHE_DIR", str(BASE_DIR / ".cache"))).expanduser() / "posts.json"
+POST_CACHE_FORMAT = 3  # bump whenever BlogPost or the post parsing changes
+RENDER_VERSION = 1  # bump whenever the MarkdownIt config or plugins change
+RENDER_CACHE_SIZE = 16 ** 4
+
+# libyaml's C loader when available; same results as SafeLoader, several times faster
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S%z")
+_FRONT_MATTER_RE = re.compile(r"\A-{3,}[ \t]*\r?\n(.*?)^-{3,}\s*$", re.DOTALL | re.MULTILINE)
+# @[Preview](url) link cards and @content/path:10-20 file snippets
+_PREVIEW_RE = re.compile(
+    r"@\[Preview\]\((?P<url>https?://[^\)]+)\)"
+    r"|@(?P<file>content/[a-zA-Z0-9_./-]+)(?::(?P<start>\d+)-(?P<end>\d+))?"
+)
+_URL_CARD_TEMPLATE = (
+    '<div class="link-preview-card">'
+    '  <a href="{url}" target="_blank" rel="noopener noreferrer">'
+    '    <div class="link-preview-info">'
+    '      <span class="link-preview-title">{url}</span>'
+    '      <span class="link-preview-domain">{domain}</span>'
+    '    </div>'
+    '  </a>'
+    '</div>'
+)
+_FILE_CARD_TEMPLATE = (
+    '<div class="file-preview-card">'
+    '  <div class="file-preview-header">{source}</div>'
+    '  <pre><code class="language-{ext}">{snippet}</code></pre>'
+    '</div>'
+)
+
+_markdown_local = threading.local()  # one MarkdownIt per parse worker thread
+_render_cache: Dict[bytes, str] = {}  # blake2b(RENDER_VERSION, markdown) -> html
 
 _posts_index: Dict[str, BlogPost] = {}
 _ordered_posts: List[BlogPost] = []
 _groups_index: Dict[str, GroupSummary] = {}
+_sorted_groups: List[GroupSummary] = []  # by name, case-insensitive
 _posts_by_group: Dict[str, List[BlogPost]] = {}
 _daily_posts: List[BlogPost] = []
 _columns_index: Dict[str, Dict[str, List[BlogPost]]] = {}  # column -> subcolumn -> posts
+_navigation: Dict[str, List[str]] = {}  # column -> subcolumns, both sorted
+_posts_by_column: Dict[str, List[BlogPost]] = {}  # column -> posts of all subcolumns, newest first
+_posts_by_tag: Dict[str, List[BlogPost]] = {}  # lowercased tag -> posts
+_posts_by_lang: Dict[str, List[BlogPost]] = {}  # lang -> non-daily posts
+_daily_by_lang: Dict[str, List[BlogPost]] = {}  # lang -> daily posts
+_loaded = False  # posts are loaded on first access rather than at import
+_load_lock = threading.Lock()
+_cache_version = 0  # bumped on every reload so derived caches know to drop their entries
+# (path, mtime_ns, size) of every file a post's @content/ previews read; (path, -1, -1) if it was missing
+PreviewStamps = Tuple[Tuple[str, int, int], ...]
+_path_cache: Dict[Path, Tuple[int, int, Optional[BlogPost], PreviewStamps]] = {}  # path -> (mtime_ns, size, post, previews)
+_dir_cache: Dict[Path, Tuple[int, List[Path], List[Path]]] = {}  # dir -> (mtime_ns, subdirs, .md files)
+# str(path) -> (content digest, post, has explicit date, previews); persisted across restarts
+_disk_cache: Optional[Dict[str, Tuple[str, Optional[BlogPost], bool, PreviewStamps]]] = None
+_disk_cache_dirty = False
 
 
 def refresh_cache() -> None:
     """Load all markdown posts into memory."""
     global _posts_index, _ordered_posts, _groups_index, _posts_by_group, _daily_posts, _columns_index
+    global _posts_by_column, _posts_by_tag, _posts_by_lang, _daily_by_lang, _cache_version, _path_cache, _dir_cache
+    global _loaded, _sorted_groups, _navigation
 
     if not CONTENT_DIR.exists():
         CONTENT_DIR.mkdir(parents=True, exist_ok=True)
         _clear_memory()
+        _path_cache = {}
+        _dir_cache = {}
+        _cache_version += 1
+        _loaded = True
         return
 
     posts: List[BlogPost] = []
     groups: Dict[str, GroupSummary] = {}
     columns: Dict[str, Dict[str, List[BlogPost]]] = {}
+    previous_cache = _path_cache
+    path_cache: Dict[Path, Tuple[int, int, Optional[BlogPost], PreviewStamps]] = {}
 
     # Recursively scan all .md files in content directory
-    for path in sorted(CONTENT_DIR.rglob("*.md")):
+    entries: List[Tuple[Path, os.stat_result]] = []
+    loaded: Dict[Path, Tuple[Optional[BlogPost], PreviewStamps]] = {}
+    pending: List[Tuple[Path, os.stat_result]] = []
+    for path in _scan_content_dir():
         try:
-            post = _load_post(path)
-        except Exception as exc:  # pylint: disable=broad-except
+            stat_result = path.stat()
+        except OSError as exc:
             logger.exception("Failed to load post %s: %s", path, exc)
             continue
-
+        entries.append((path, stat_result))
+        cached = previous_cache.get(path)
+        # Only re-parse files whose mtime or size, or that of a previewed file, changed since the last refresh
+        if (
+            cached is not None
+            and cached[:2] == (stat_result.st_mtime_ns, stat_result.st_size)
+            and _previews_unchanged(cached[3])
+        ):
+            loaded[path] = cached[2:]
+        else:
+            pending.append((path, stat_result))
+
+    # Parse changed files concurrently; the disk cache is loaded up front so workers only read it
+    _get_disk_cache()
+    if len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1)) as pool:
+            results = list(pool.map(_load_post_safely, pending))
+    else:
+        results = [_load_post_safely(item) for item in pending]
+    for (path, _), (ok, post, previews) in zip(pending, results):
+        if ok:
+            loaded[path] = (post, previews)
+
+    for path, stat_result in entries:
+        if path not in loaded:
+            continue
+        post, previews = loaded[path]
+        path_cache[path] = (stat_result.st_mtime_ns, stat_result.st_size, post, previews)
         if post is None:
             continue
 
@@ -107,65 +199,130 @@ def refresh_cache() -> None:
             if post.group_description and not summary.description:
                 summary.description = post.group_description
 
-    # Sort by pinned (desc), then date (desc)
-    posts.sort(key=lambda item: (item.pinned, item.date), reverse=True)
+    # Sort by pinned (desc), then date (desc): two stable sorts, no key tuples
+    posts.sort(key=attrgetter("date"), reverse=True)
+    posts.sort(key=attrgetter("pinned"), reverse=True)
     _ordered_posts = posts
     _posts_index = {post.slug: post for post in posts}
     _daily_posts = [post for post in posts if post.is_daily]
 
     grouped: Dict[str, List[BlogPost]] = {}
+    by_tag: Dict[str, List[BlogPost]] = {}
+    by_lang: Dict[str, List[BlogPost]] = {}
+    daily_by_lang: Dict[str, List[BlogPost]] = {}
     for post in posts:
         if post.group_slug:
             grouped.setdefault(post.group_slug, []).append(post)
+        for tag in set(post.tags_lower):
+            by_tag.setdefault(tag, []).append(post)
+        target = daily_by_lang if post.is_daily else by_lang
+        target.setdefault(post.lang, []).append(post)
     _posts_by_group = grouped
+    _posts_by_tag = by_tag
+    _posts_by_lang = by_lang
+    _daily_by_lang = daily_by_lang
+
+    by_column: Dict[str, List[BlogPost]] = {}
+    for column, subcolumns in columns.items():
+        column_posts = [post for subcol_posts in subcolumns.values() for post in subcol_posts]
+        column_posts.sort(key=attrgetter("date"), reverse=True)
+        by_column[column] = column_posts
+    _posts_by_column = by_column
 
     _groups_index = groups
+    _sorted_groups = sorted(groups.values(), key=lambda item: item.name.lower())
     _columns_index = columns
+    _navigation = {
+        column: sorted(sub for sub in columns[column] if sub != "_root") for column in sorted(columns)
+    }
+    _path_cache = path_cache
+    _cache_version += 1
+    _loaded = True
+    _save_disk_cache({str(path) for path in path_cache})
+
+
+def _ensure_loaded() -> None:
+    """Load the posts on first access; later calls are a single flag check."""
+    global _loaded
+    if _loaded:
+        return
+    with _load_lock:
+        if _loaded:
+            return
+        try:
+            refresh_cache()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Initial markdown load failed: %s", exc)
+            _loaded = True
+
+
+def cache_version() -> int:
+    """Return a counter that changes whenever the in-memory posts are reloaded."""
+    _ensure_loaded()
+    return _cache_version
 
 
-def list_posts(*, include_daily: bool = False) -> List[BlogPost]:
-    """Return posts sorted by date."""
+def list_posts(*, include_daily: bool = False, lang: Optional[str] = None) -> List[BlogPost]:
+    """Return posts sorted by date, optionally restricted to one language."""
+    _ensure_loaded()
+    if lang is not None:
+        if include_daily:
+            return [post for post in _ordered_posts if post.lang == lang]
+        return list(_posts_by_lang.get(lang, ()))
     if include_daily:
         return list(_ordered_posts)
     return [post for post in _ordered_posts if not post.is_daily]
 
 
 def get_post(slug: str) -> Optional[BlogPost]:
+    _ensure_loaded()
     return _posts_index.get(slug)
 
 
 def get_latest_daily() -> Optional[BlogPost]:
+    _ensure_loaded()
     return _daily_posts[0] if _daily_posts else None
 
 
-def list_daily_posts() -> List[BlogPost]:
+def list_daily_posts(lang: Optional[str] = None) -> List[BlogPost]:
+    _ensure_loaded()
+    if lang is not None:
+        return list(_daily_by_lang.get(lang, ()))
     return list(_daily_posts)
 
 
 def list_groups() -> List[GroupSummary]:
-    groups = list(_groups_index.values())
-    groups.sort(key=lambda item: item.name.lower())
-    return groups
+    _ensure_loaded()
+    return list(_sorted_groups)
 
 
 def get_group_by_slug(group_slug: str) -> Optional[GroupSummary]:
+    _ensure_loaded()
     return _groups_index.get(group_slug)
 
 
 def list_posts_by_group(group_slug: str) -> List[BlogPost]:
+    _ensure_loaded()
     return list(_posts_by_group.get(group_slug, []))
 
 
 def list_posts_by_tag(tag: str) -> List[BlogPost]:
     """List posts that contain the given tag (case-insensitive)."""
+    _ensure_loaded()
     normalized = tag.lower().strip()
     if not normalized:
         return []
-    matching: List[BlogPost] = []
-    for post in _ordered_posts:
-        if any(t.lower() == normalized for t in post.tags):
-            matching.append(post)
-    return matching
+    return list(_posts_by_tag.get(normalized, ()))
+
+
+def list_posts_by_tags(tags: Iterable[str]) -> List[BlogPost]:
+    """List posts carrying any of the given tags (case-insensitive), newest first, each once."""
+    _ensure_loaded()
+    unique: Dict[str, BlogPost] = {}
+    for tag in tags:
+        for post in _posts_by_tag.get(tag.lower().strip(), ()):
+            unique.setdefault(post.slug, post)
+    return sorted(unique.values(), key=attrgetter("date"), reverse=True)
 
 
 def filter_by_language(posts: List[BlogPost], lang: str) -> List[BlogPost]:
@@ -175,30 +332,25 @@ def filter_by_language(posts: List[BlogPost], lang: str) -> List[BlogPost]:
 
 def list_columns() -> List[str]:
     """List all column names."""
-    return sorted(_columns_index.keys())
+    _ensure_loaded()
+    return list(_navigation)
 
 
 def list_subcolumns(column: str) -> List[str]:
     """List all subcolumn names for a given column."""
-    if column not in _columns_index:
-        return []
-    subcolumns = [sc for sc in _columns_index[column].keys() if sc != "_root"]
-    return sorted(subcolumns)
+    _ensure_loaded()
+    return list(_navigation.get(column, ()))
 
 
 def get_navigation_structure() -> Dict[str, List[str]]:
     """Return a dictionary of column -> list[subcolumns] for navigation."""
-    structure = {}
-    for col, subcols in _columns_index.items():
-        # Filter out _root and sort subcolumns
-        subs = sorted([s for s in subcols.keys() if s != "_root"])
-        structure[col] = subs
-    # Sort columns alphabetically
-    return dict(sorted(structure.items()))
+    _ensure_loaded()
+    return {column: list(subcolumns) for column, subcolumns in _navigation.items()}
 
 
 def list_posts_by_column(column: str, subcolumn: Optional[str] = None) -> List[BlogPost]:
     """List posts in a column, optionally filtered by subcolumn."""
+    _ensure_loaded()
     if column not in _columns_index:
         return []
     
@@ -208,41 +360,204 @@ def list_posts_by_column(column: str, subcolumn: Optional[str] = None) -> List[B
         return []
     
     # Return all posts in the column (from all subcolumns)
-    all_posts: List[BlogPost] = []
-    for subcol_posts in _columns_index[column].values():
-        all_posts.extend(subcol_posts)
-    all_posts.sort(key=lambda p: p.date, reverse=True)
-    return all_posts
+    return list(_posts_by_column.get(column, ()))
 
 
 def _clear_memory() -> None:
     global _posts_index, _ordered_posts, _groups_index, _posts_by_group, _daily_posts, _columns_index
+    global _posts_by_column, _posts_by_tag, _posts_by_lang, _daily_by_lang, _sorted_groups, _navigation
     _posts_index = {}
     _ordered_posts = []
     _groups_index = {}
+    _sorted_groups = []
     _posts_by_group = {}
     _daily_posts = []
     _columns_index = {}
+    _navigation = {}
+    _posts_by_column = {}
+    _posts_by_tag = {}
+    _posts_by_lang = {}
+    _daily_by_lang = {}
+
+
+def _scan_content_dir() -> List[Path]:
+    """Return every .md file under CONTENT_DIR, re-listing only directories whose mtime changed.
+
+    A directory's mtime moves when entries are added, removed or renamed in it, so an
+    unchanged directory reuses its previous listing. Edits to existing files don't touch
+    the directory; those are still caught by the per-file stat in refresh_cache.
+    """
+    global _dir_cache
+
+    previous = _dir_cache
+    dir_cache: Dict[Path, Tuple[int, List[Path], List[Path]]] = {}
+    files: List[Path] = []
+    stack = [CONTENT_DIR]
+    while stack:
+        directory = stack.pop()
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+            cached = previous.get(directory)
+            if cached is not None and cached[0] == mtime_ns:
+                subdirs, md_files = cached[1], cached[2]
+            else:
+                subdirs, md_files = [], []
+                # scandir reports entry types from the directory read itself, no stat per entry
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        # Like rglob, don't descend into symlinked directories
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(Path(entry.path))
+                        elif entry.name.endswith(".md"):
+                            md_files.append(Path(entry.path))
+        except OSError as exc:
+            logger.warning("Failed to scan content directory %s: %s", directory, exc)
+            continue
+        dir_cache[directory] = (mtime_ns, subdirs, md_files)
+        files.extend(md_files)
+        stack.extend(subdirs)
+
+    _dir_cache = dir_cache
+    return sorted(files)
 
 
-def _load_post(path: Path) -> Optional[BlogPost]:
-    parsed = frontmatter.load(path)
-    meta = parsed.metadata or {}
-    content = parsed.content.strip()
+def _get_disk_cache() -> Dict[str, Tuple[str, Optional[BlogPost], bool, PreviewStamps]]:
+    global _disk_cache
+    if _disk_cache is None:
+        _disk_cache = {}
+        try:
+            # JSON rather than pickle: the cache dir may be writable by others, and loading it must
+            # never run code
+            data = json.loads(POST_CACHE_PATH.read_bytes())
+            if data.get("format") == [POST_CACHE_FORMAT, RENDER_VERSION]:
+                _disk_cache = {
+                    path: (
+                        entry["digest"],
+                        _post_from_json(entry["post"]) if entry["post"] is not None else None,
+                        entry["has_date"],
+                        tuple((source, mtime_ns, size) for source, mtime_ns, size in entry["previews"]),
+                    )
+                    for path, entry in data["entries"].items()
+                }
+        except FileNotFoundError:
+            pass
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.warning("Ignoring unreadable post cache %s: %s", POST_CACHE_PATH, exc)
+    return _disk_cache
+
+
+def _save_disk_cache(live_paths: set[str]) -> None:
+    """Drop entries for deleted files and write the cache back if anything changed."""
+    global _disk_cache_dirty
+    cache = _get_disk_cache()
+    for stale in cache.keys() - live_paths:
+        del cache[stale]
+        _disk_cache_dirty = True
+    if not _disk_cache_dirty:
+        return
+    entries = {
+        path: {
+            "digest": digest,
+            "post": _post_to_json(post) if post is not None else None,
+            "has_date": has_date,
+            "previews": previews,
+        }
+        for path, (digest, post, has_date, previews) in cache.items()
+    }
+    data = {"format": [POST_CACHE_FORMAT, RENDER_VERSION], "entries": entries}
+    try:
+        POST_CACHE_PATH.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        tmp_path = POST_CACHE_PATH.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, POST_CACHE_PATH)
+        _disk_cache_dirty = False
+    except OSError as exc:
+        logger.warning("Could not write post cache %s: %s", POST_CACHE_PATH, exc)
+
+
+_POST_FIELDS = tuple(item.name for item in fields(BlogPost))
+
+
+def _post_to_json(post: BlogPost) -> dict:
+    data = {name: getattr(post, name) for name in _POST_FIELDS}
+    data["date"] = post.date.isoformat()
+    return data
+
+
+def _post_from_json(data: dict) -> BlogPost:
+    post = BlogPost(**data)
+    post.date = datetime.fromisoformat(post.date)
+    post.tags_lower = tuple(post.tags_lower)
+    return post
+
+
+def _load_post_safely(item: Tuple[Path, os.stat_result]) -> Tuple[bool, Optional[BlogPost], PreviewStamps]:
+    path, stat_result = item
+    try:
+        return (True, *_load_post(path, stat_result))
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("Failed to load post %s: %s", path, exc)
+        return False, None, ()
+
+
+def _load_post(
+    path: Path, stat_result: Optional[os.stat_result] = None
+) -> Tuple[Optional[BlogPost], PreviewStamps]:
+    """Load a post, reusing the on-disk cache when the file and its previewed files are unchanged."""
+    global _disk_cache_dirty
+    data = path.read_bytes()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    cache = _get_disk_cache()
+    cached = cache.get(str(path))
+    if cached is not None and cached[0] == digest and _previews_unchanged(cached[3]):
+        post, has_date, previews = cached[1:]
+        if post is not None and not has_date:
+            # The fallback date comes from the file mtime, which the content digest doesn't cover
+            post.date = _file_modified_at(path, stat_result)
+        return post, previews
+
+    post, has_date, previews = _parse_post(path, data.decode("utf-8"), stat_result)
+    cache[str(path)] = (digest, post, has_date, previews)
+    _disk_cache_dirty = True
+    return post, previews
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    try:
+        stat_result = path.stat()
+    except OSError:
+        return -1, -1
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _previews_unchanged(previews: PreviewStamps) -> bool:
+    return all(_file_stamp(Path(path)) == (mtime_ns, size) for path, mtime_ns, size in previews)
+
+
+def _parse_post(
+    path: Path, text: str, stat_result: Optional[os.stat_result] = None
+) -> Tuple[Optional[BlogPost], bool, PreviewStamps]:
+    """Parse a markdown file; the flag tells whether its date came from front matter.
+
+    Also returns the stamps of the files its @content/ previews read, so caches can tell when they change.
+    """
+    meta, content = _split_front_matter(text)
+    content = content.strip()
 
     if not content:
         logger.warning("Skipping empty post: %s", path)
-        return None
+        return None, True, ()
     
     # Skip draft posts
     if meta.get("draft") or meta.get("published") is False:
-        return None
+        return None, True, ()
 
     title = str(meta.get("title") or _title_from_path(path))
     slug = str(meta.get("slug") or _slugify(path.stem))
 
     raw_date = meta.get("date")
-    timestamp = _parse_date(raw_date) or _file_modified_at(path)
+    parsed_date = _parse_date(raw_date)
+    timestamp = parsed_date or _file_modified_at(path, stat_result)
 
     group_slug: Optional[str] = None
     group_label: Optional[str] = None
@@ -263,8 +578,8 @@ def _load_post(path: Path) -> Optional[BlogPost]:
         if isinstance(group_description, str):
             group_description = group_description.strip()
 
-    content_for_render, preview_map = _process_preview_shortcodes(content)
-    content_html = _markdown.render(content_for_render)
+    content_for_render, preview_map, previews = _process_preview_shortcodes(content)
+    content_html = _render(content_for_render)
     
     # Inject previews back into HTML
     for placeholder, preview_html in preview_map.items():
@@ -284,7 +599,7 @@ def _load_post(path: Path) -> Optional[BlogPost]:
     from app.services.i18n import normalize_lang
     lang = normalize_lang(meta.get("lang") or meta.get("language"))
 
-    return BlogPost(
+    post = BlogPost(
         slug=slug,
         title=title,
         summary=summary,
@@ -296,10 +611,46 @@ def _load_post(path: Path) -> Optional[BlogPost]:
         group_label=group_label,
         group_description=group_description,
         tags=tags,
+        tags_lower=tuple(tag.lower() for tag in tags),
         is_daily=is_daily,
         lang=lang,
         pinned=pinned,
     )
+    return post, parsed_date is not None, previews
+
+
+def _get_markdown() -> MarkdownIt:
+    """Return this thread's renderer; MarkdownIt instances are not shared across threads."""
+    md = getattr(_markdown_local, "md", None)
+    if md is None:
+        md = MarkdownIt("commonmark", {"html": True}).enable("table").enable("strikethrough").enable("fence")
+        md.use(tasklists_plugin)
+        _markdown_local.md = md
+    return md
+
+
+def _render(content: str) -> str:
+    """Render markdown to HTML, reusing the output for bodies rendered before."""
+    key = hashlib.blake2b(content.encode("utf-8"), digest_size=16, salt=RENDER_VERSION.to_bytes(16, "big")).digest()
+    rendered = _render_cache.get(key)
+    if rendered is None:
+        rendered = _get_markdown().render(content)
+        if len(_render_cache) >= RENDER_CACHE_SIZE:
+            # Evict the oldest entry; dicts keep insertion order
+            _render_cache.pop(next(iter(_render_cache)), None)
+        _render_cache[key] = rendered
+    return rendered
+
+
+def _split_front_matter(text: str) -> Tuple[dict, str]:
+    """Split a ``---`` delimited YAML header from the markdown body."""
+    text = text.strip()
+    if text.startswith("---"):
+        match = _FRONT_MATTER_RE.match(text)
+        if match:
+            meta = yaml.load(match.group(1), Loader=YAML_LOADER)
+            return (meta if isinstance(meta, dict) else {}), text[match.end():]
+    return {}, text
 
 
 def _title_from_path(path: Path) -> str:
@@ -321,33 +672,46 @@ def _parse_date(value) -> Optional[datetime]:
 
     if isinstance(value, str):
         text = value.strip()
-        for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S%z"):
+        # fromisoformat covers the common padded ISO forms without strptime's overhead
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            pass
+        # Slash dates, unpadded fields and "Z"/"+0800" offsets
+        for fmt in _DATE_FORMATS:
             try:
                 return datetime.strptime(text, fmt)
             except ValueError:
                 continue
-        try:
-            return datetime.fromisoformat(text)
-        except ValueError:
-            logger.warning("Unrecognized date format '%s'", value)
-            return None
+        logger.warning("Unrecognized date format '%s'", value)
+        return None
 
     return None
 
 
-def _file_modified_at(path: Path) -> datetime:
-    stat = path.stat()
+def _file_modified_at(path: Path, stat_result: Optional[os.stat_result] = None) -> datetime:
+    stat = stat_result or path.stat()
     return datetime.fromtimestamp(stat.st_mtime)
 
 
-_slug_pattern = re.compile(r"[^a-z0-9]+")
+class _SlugTable(dict):
+    """str.translate table: keeps [a-z0-9], maps every other code point to "-"."""
+
+    def __missing__(self, codepoint: int) -> str:
+        char = chr(codepoint)
+        mapped = char if char in "abcdefghijklmnopqrstuvwxyz0123456789" else "-"
+        self[codepoint] = mapped
+        return mapped
+
+
+_slug_table = _SlugTable()
+_whitespace_pattern = re.compile(r"\s+")
 
 
 def _slugify(value: str) -> str:
-    normalized = value.strip().lower()
-    normalized = _slug_pattern.sub("-", normalized)
-    normalized = normalized.strip("-")
-    return normalized or "post"
+    # Split on the dashes to collapse runs and trim the ends in one step
+    parts = value.lower().translate(_slug_table).split("-")
+    return "-".join(part for part in parts if part) or "post"
 
 
 def _extract_summary(meta: dict, content: str) -> str:
@@ -355,7 +719,7 @@ def _extract_summary(meta: dict, content: str) -> str:
     if isinstance(summary, str) and summary.strip():
         return summary.strip()
 
-    plain = re.sub(r"\s+", " ", content.strip())
+    plain = _whitespace_pattern.sub(" ", content.strip())
     max_length = 160
     if len(plain) <= max_length:
         return plain
@@ -372,60 +736,47 @@ def _extract_excerpt_html(html: str) -> str:
     return snippet
 
 
-def _process_preview_shortcodes(content: str) -> tuple[str, dict[str, str]]:
+def _process_preview_shortcodes(content: str) -> tuple[str, dict[str, str], PreviewStamps]:
     """
     Find @[Preview](url) and @content/path:1-10 patterns.
-    Replace them with placeholders and return a map of placeholder -> HTML.
+    Replace them with placeholders and return a map of placeholder -> HTML,
+    plus the (path, mtime_ns, size) of every file the previews looked at.
     """
     preview_map = {}
+    sources: Dict[str, Tuple[int, int]] = {}
+    escape = html.escape
     
     # 1. URL Previews: @[Preview](url)
-    # Regex to capture url
-    url_pattern = re.compile(r'@\[Preview\]\((https?://[^\)]+)\)')
-    
     def url_replacer(match):
-        url = match.group(1)
+        url = match.group("url")
         placeholder = f"<!--PREVIEW_URL_{len(preview_map)}-->"
         # Generate a simple card HTML
-        card_html = (
-            f'<div class="link-preview-card">'
-            f'  <a href="{url}" target="_blank" rel="noopener noreferrer">'
-            f'    <div class="link-preview-info">'
-            f'      <span class="link-preview-title">{html.escape(url)}</span>'
-            f'      <span class="link-preview-domain">{html.escape(url.split("/")[2])}</span>'
-            f'    </div>'
-            f'  </a>'
-            f'</div>'
-        )
-        preview_map[placeholder] = card_html
+        # The href is escaped too, so a quote in the URL can't break out of the attribute
+        preview_map[placeholder] = _URL_CARD_TEMPLATE.format(url=escape(url), domain=escape(url.split("/")[2]))
         return placeholder
 
-    content = url_pattern.sub(url_replacer, content)
-
     # 2. Local File Previews: @content/path/to/file.md:10-20
-    # Regex to capture path and optional line range
-    file_pattern = re.compile(r'@(content/[a-zA-Z0-9_./-]+)(?::(\d+)-(\d+))?')
-
     def file_replacer(match):
-        rel_path_str = match.group(1)
-        start_line = match.group(2)
-        end_line = match.group(3)
+        rel_path_str = match.group("file")
+        start_line = match.group("start")
+        end_line = match.group("end")
         
         file_path = BASE_DIR / rel_path_str
+        # Stamp before reading so an edit made while parsing is still seen on the next refresh
+        sources[str(file_path)] = _file_stamp(file_path)
         if not file_path.exists() or not file_path.is_file():
             return match.group(0)  # Leave as is if file not found
 
         try:
-            file_content = file_path.read_text(encoding="utf-8")
-            lines = file_content.splitlines()
-            
             if start_line and end_line:
+                # Only read up to the last requested line
                 start = max(0, int(start_line) - 1)
-                end = min(len(lines), int(end_line))
-                snippet = "\n".join(lines[start:end])
+                with file_path.open(encoding="utf-8") as fp:
+                    window = islice(fp, start, int(end_line))
+                    snippet = "".join(window).removesuffix("\n")
                 source_info = f"{rel_path_str}:{start_line}-{end_line}"
             else:
-                snippet = file_content
+                snippet = file_path.read_text(encoding="utf-8")
                 source_info = rel_path_str
 
             # Detect language from extension
@@ -440,22 +791,24 @@ def _process_preview_shortcodes(content: str) -> tuple[str, dict[str, str]]:
             # If it's markdown, we might want to render it? 
             # User said "HTML form", let's render as code block for clarity as it's a preview.
             
-            block_html = (
-                f'<div class="file-preview-card">'
-                f'  <div class="file-preview-header">{html.escape(source_info)}</div>'
-                f'  <pre><code class="language-{ext}">{html.escape(snippet)}</code></pre>'
-                f'</div>'
+            preview_map[placeholder] = _FILE_CARD_TEMPLATE.format(
+                source=escape(source_info), ext=ext, snippet=escape(snippet)
             )
-            preview_map[placeholder] = block_html
             return placeholder
             
         except Exception as e:
             logger.warning(f"Failed to read file preview {rel_path_str}: {e}")
             return match.group(0)
 
-    content = file_pattern.sub(file_replacer, content)
-    
-    return content, preview_map
+    def replacer(match):
+        if match.group("url") is not None:
+            return url_replacer(match)
+        return file_replacer(match)
+
+    # Both shortcodes are handled in one scan; their alternatives never overlap
+    content = _PREVIEW_RE.sub(replacer, content)
+
+    return content, preview_map, tuple((path, *stamp) for path, stamp in sources.items())
 
 
 def _normalize_tags(value) -> List[str]:
@@ -470,12 +823,3 @@ def _normalize_tags(value) -> List[str]:
                 tags.append(item.strip())
         return tags
     return []
-
-
-try:
-    refresh_cache()
-except Exception as exc:  # pylint: disable=broad-except
-    logger.warning("Initial markdown load failed: %s", exc)
-
-
-
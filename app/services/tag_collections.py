@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import json
 import logging
+import threading
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
 import yaml
 
+from app.services.markdown_loader import YAML_LOADER
+from app.speedups import orjson
+
 logger = logging.getLogger(__name__)
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -26,8 +31,8 @@ class TagCollection:
     color: Optional[str]
 
 
-@dataclass(slots=True)
-class TagBadge:
+class TagBadge(NamedTuple):
+    # A tuple rather than a dataclass: one is built per tag of every listed post
     tag: str
     label: str
     collection: Optional[TagCollection]
@@ -35,6 +40,9 @@ class TagBadge:
 
 _tag_to_collection: Dict[str, TagCollection] = {}
 _loaded = False
+_load_lock = threading.Lock()
+_version = 0
+_loaded_stamp: Optional[Tuple[Path, int]] = None  # collections file the mapping was built from
 
 
 def _read_collections_file() -> List[dict]:
@@ -42,10 +50,10 @@ def _read_collections_file() -> List[dict]:
         if path.exists():
             try:
                 if path.suffix in {".yaml", ".yml"}:
-                    with path.open("r", encoding="utf-8") as fp:
-                        data = yaml.safe_load(fp) or {}
+                    data = yaml.load(path.read_bytes(), Loader=YAML_LOADER) or {}
                 else:
-                    data = json.loads(path.read_text(encoding="utf-8"))
+                    raw = path.read_bytes()
+                    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
             except Exception as exc:  # pylint: disable=broad-except
                 logger.warning("Failed to load tag collections from %s: %s", path, exc)
                 return []
@@ -58,50 +66,123 @@ def _read_collections_file() -> List[dict]:
     return []
 
 
-def _ensure_loaded() -> None:
-    global _loaded, _tag_to_collection
-    if _loaded:
-        return
-    mapping: Dict[str, TagCollection] = {}
+def _collections_file() -> Optional[Path]:
+    for path in COLLECTIONS_PATHS:
+        if path.exists():
+            return path
+    return None
+
+
+def _collections_stamp() -> Optional[Tuple[Path, int]]:
+    path = _collections_file()
+    if path is None:
+        return None
+    try:
+        return path, path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _parse_collections() -> List[Tuple[TagCollection, Tuple[str, ...]]]:
+    """Normalize every valid entry of the collections file, in file order."""
+    parsed: List[Tuple[TagCollection, Tuple[str, ...]]] = []
+    append = parsed.append
     for entry in _read_collections_file():
-        name = str(entry.get("name") or "").strip()
-        slug = str(entry.get("slug") or "").strip() or name.lower().replace(" ", "-")
+        get = entry.get
+        name = str(get("name") or "").strip()
         if not name:
             continue
-        color = entry.get("color")
+        slug = str(get("slug") or "").strip() or name.lower().replace(" ", "-")
+        color = get("color")
         if isinstance(color, str):
             color = color.strip() or None
-        description = entry.get("description")
+        description = get("description")
         if isinstance(description, str):
             description = description.strip() or None
-        collection = TagCollection(slug=slug, name=name, description=description, color=color)
-        tags = entry.get("tags") or []
+        tags = get("tags") or []
         if isinstance(tags, str):
             tags = [tags]
-        for raw_tag in tags:
-            if not isinstance(raw_tag, str):
-                continue
-            tag = raw_tag.strip()
-            if not tag:
-                continue
+        stripped = (t.strip() for t in tags if isinstance(t, str))
+        matching_tags = tuple(t for t in stripped if t)
+        append((TagCollection(slug=slug, name=name, description=description, color=color), matching_tags))
+    return parsed
+
+
+@lru_cache(maxsize=1)
+def _collections_index(path: Path, mtime_ns: int) -> Dict[str, Tuple[TagCollection, Tuple[str, ...]]]:
+    """Map collection slug -> (collection, matching tags); the args only key the cache."""
+    index: Dict[str, Tuple[TagCollection, Tuple[str, ...]]] = {}
+    for collection, matching_tags in _parse_collections():
+        # The first entry with a given slug wins
+        index.setdefault(collection.slug, (collection, matching_tags))
+    return index
+
+
+def list_collections() -> List[Tuple[TagCollection, Tuple[str, ...]]]:
+    """Return every collection with the tags it groups, in file order."""
+    path = _collections_file()
+    if path is None:
+        return []
+    return list(_collections_index(path, path.stat().st_mtime_ns).values())
+
+
+def get_collection(slug: str) -> Optional[Tuple[TagCollection, Tuple[str, ...]]]:
+    """Return the collection with ``slug`` and the tags it groups, or None."""
+    path = _collections_file()
+    if path is None:
+        return None
+    return _collections_index(path, path.stat().st_mtime_ns).get(slug)
+
+
+def _ensure_loaded() -> None:
+    if _loaded:
+        return
+    with _load_lock:
+        # Another thread may have finished loading while we waited
+        if not _loaded:
+            _load_mapping()
+
+
+def _load_mapping() -> None:
+    global _loaded, _tag_to_collection, _loaded_stamp
+    # Stamp before reading so an edit made while parsing still triggers a reload
+    stamp = _collections_stamp()
+    mapping: Dict[str, TagCollection] = {}
+    for collection, matching_tags in _parse_collections():
+        # Later collections claim a shared tag
+        for tag in matching_tags:
             mapping[tag.lower()] = collection
+    # Publish the finished dict in one rebinding so readers never see it half-built
     _tag_to_collection = mapping
+    _loaded_stamp = stamp
     _loaded = True
 
 
 def refresh() -> None:
     """Reload collection mapping (used on startup)."""
-    global _loaded
-    _loaded = False
-    _ensure_loaded()
+    global _version
+    with _load_lock:
+        _load_mapping()
+        _version += 1
+        _build_badges_cached.cache_clear()
 
 
-def build_badges(tags: List[str]) -> List[TagBadge]:
-    _ensure_loaded()
+def cache_version() -> int:
+    """Return a counter that changes whenever the collection mapping is reloaded.
+
+    An edited collections file is reloaded here, so pages cached against the old counter are dropped.
+    """
+    if _loaded and _collections_stamp() != _loaded_stamp:
+        refresh()
+    return _version
+
+
+@lru_cache(maxsize=4096)
+def _build_badges_cached(tags: Tuple[str, ...], tags_lower: Tuple[str, ...]) -> Tuple[TagBadge, ...]:
     badges: List[TagBadge] = []
-    for tag in tags:
-        normalized = tag.lower()
-        collection = _tag_to_collection.get(normalized)
+    lookup = _tag_to_collection.get
+    for tag, normalized in zip(tags, tags_lower):
+        collection = lookup(normalized)
         badges.append(
             TagBadge(
                 tag=tag,
@@ -109,6 +190,12 @@ def build_badges(tags: List[str]) -> List[TagBadge]:
                 collection=collection,
             )
         )
-    return badges
+    return tuple(badges)
 
 
+def build_badges(tags: Iterable[str], tags_lower: Optional[Iterable[str]] = None) -> Tuple[TagBadge, ...]:
+    """Badges for ``tags``; pass ``tags_lower`` (e.g. ``post.tags_lower``) when already known."""
+    _ensure_loaded()
+    tags = tuple(tags)
+    tags_lower = tuple(tags_lower) if tags_lower is not None else tuple(tag.lower() for tag in tags)
+    return _build_badges_cached(tags, tags_lower)
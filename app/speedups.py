@@ -0,0 +1,10 @@
+"""Optional accelerators, installed with ``uv sync --extra speedups``."""
+
+from __future__ import annotations
+
+try:
+    import orjson
+except ImportError:  # stdlib json is used wherever orjson is missing
+    orjson = None
+
+__all__ = ["orjson"]
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import os
+import re
+
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+
+# Content-hashed names such as "app.3f9a1c2e5b7d9f01.css" never change. The run must be long and
+# contain a letter, so date stamps like "screenshot-20240115.png" are not mistaken for hashes
+_HASHED_NAME = re.compile(r"(?:^|[.-])(?=[0-9]*[a-f])[0-9a-f]{16,}(?:[.-]|$)")
+# Comment uploads get a fresh random name each and are never overwritten
+_IMMUTABLE_DIRS = (os.path.join("uploads", "comments") + os.sep,)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that lets browsers and CDNs cache assets instead of revalidating them."""
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if is_immutable(self.get_path(scope)):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = DEFAULT_CACHE_CONTROL
+        return response
+
+
+def is_immutable(path: str) -> bool:
+    """Whether the static file at ``path`` (relative to the static directory) can never change."""
+    return path.startswith(_IMMUTABLE_DIRS) or _HASHED_NAME.search(os.path.basename(path)) is not None
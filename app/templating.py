@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+from typing import Iterable, Iterator
+
+from fastapi.responses import StreamingResponse
+from fastapi.templating import Jinja2Templates
+
+
+DEBUG = os.getenv("RINBLOG_DEBUG", "").lower() in {"1", "true", "yes"}
+TEMPLATE_NAMES = (
+    "index.html",
+    "post_detail.html",
+    "group.html",
+    "daily.html",
+    "collection.html",
+    "column.html",
+    "subcolumn.html",
+    "tag.html",
+)
+
+# Template.generate() yields one fragment per text node or expression; sending each one as its
+# own ASGI message costs far more than rendering, so they are joined into blocks of this size
+STREAM_CHUNK_SIZE = 16 * 1024
+
+templates = Jinja2Templates(directory="templates")
+if not DEBUG:
+    # Templates only change on deploy: keep every compiled template and skip the mtime check
+    templates.env.cache = {}
+    templates.env.auto_reload = False
+
+
+def preload_templates() -> None:
+    """Compile all page templates up front so the first request does not pay for it."""
+    for name in TEMPLATE_NAMES:
+        templates.env.get_template(name)
+
+
+def stream_template(name: str, context: dict) -> StreamingResponse:
+    """Render a template chunk by chunk instead of building the whole page in memory."""
+    template = templates.env.get_template(name)
+    return StreamingResponse(_buffered(template.generate(context)), media_type="text/html")
+
+
+def _buffered(fragments: Iterable[str], size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    buffer = []
+    pending = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        pending += len(fragment)
+        if pending >= size:
+            yield "".join(buffer)
+            buffer = []
+            pending = 0
+    if buffer:
+        yield "".join(buffer)
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Callable, Dict
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -14,19 +18,29 @@ import sys
 
 sys.path.insert(0, str(BASE_DIR))
 
-import sys
-
-sys.path.insert(0, str(BASE_DIR))
-
 from app.services import markdown_loader, i18n, tag_collections
 TEMPLATES_DIR = BASE_DIR / "templates"
 STATIC_DIR = BASE_DIR / "static"
 DEFAULT_OUTPUT = BASE_DIR / "site"
+TEMPLATE_NAMES = (
+    "index.html",
+    "daily.html",
+    "group.html",
+    "column.html",
+    "subcolumn.html",
+    "collection.html",
+    "post_detail.html",
+)
+CACHE_DIR = Path(os.getenv("RINBLOG_CACHE_DIR", str(BASE_DIR / ".cache"))).expanduser()
+JINJA_CACHE_DIR = CACHE_DIR / "jinja"
+# One manifest per output dir (output-relative page path -> blake2b of its HTML), kept out of the
+# published tree
+MANIFEST_DIR = CACHE_DIR / "site"
 
 
 @dataclass
 class StaticRequest:
-    url_builder: Callable[[str, Dict[str, str]], str]
+    url_builder: Callable[..., str]
 
     @property
     def url(self):
@@ -36,125 +50,278 @@ class StaticRequest:
         return Url()
 
     def url_for(self, name: str, **params: str) -> str:
-        return self.url_builder(name, params)
+        return self.url_builder(name, **params)
+
+
+# Route name -> path below the base URL, filled from the url_for params
+URL_PATTERNS: Dict[str, str] = {
+    "homepage": "",
+    "daily_posts": "daily/",
+    "post_detail": "posts/{slug}/",
+    "group_posts": "groups/{group_slug}/",
+    "collection_posts": "collections/{collection_slug}/",
+    "column_posts": "columns/{column}/",
+    "subcolumn_posts": "columns/{column}/{subcolumn}/",
+}
 
 
-def build_url_factory(base_url: str) -> Callable[[str, Dict[str, str]], str]:
+def build_url_factory(base_url: str) -> Callable[..., str]:
     base = "/" if not base_url else f"/{base_url.strip('/')}/"
 
-    def builder(name: str, params: Dict[str, str]) -> str:
-        if name == "homepage":
-            path = ""
-        elif name == "daily_posts":
-            path = "daily/"
-        elif name == "post_detail":
-            slug = params["slug"]
-            path = f"posts/{slug}/"
-        elif name == "group_posts":
-            slug = params["group_slug"]
-            path = f"groups/{slug}/"
-        elif name == "collection_posts":
-            slug = params["collection_slug"]
-            path = f"collections/{slug}/"
-        elif name == "column_posts":
-            column = params["column"]
-            path = f"columns/{column}/"
-        elif name == "subcolumn_posts":
-            column = params["column"]
-            subcolumn = params["subcolumn"]
-            path = f"columns/{column}/{subcolumn}/"
-        elif name == "static":
-            static_path = params.get("path", "")
-            if static_path.startswith("/"):
-                static_path = static_path[1:]
-            path = f"static/{static_path}"
-        else:
-            path = ""
-        return f"{base}{path}"
-
-    return builder
-
-
-def prepare_environment(url_builder: Callable[[str, Dict[str, str]], str]) -> Environment:
+    def url_for(name: str, **params: str) -> str:
+        if name == "static":
+            return f"{base}static/{params.get('path', '').removeprefix('/')}"
+        return base + URL_PATTERNS.get(name, "").format_map(params)
+
+    return url_for
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    try:
+        JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+    return FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
+
+
+def prepare_environment(url_builder: Callable[..., str]) -> Environment:
     env = Environment(
         loader=FileSystemLoader(TEMPLATES_DIR),
         autoescape=select_autoescape(["html"]),
+        # Compiled templates persist across builds; templates don't change mid-build
+        bytecode_cache=_bytecode_cache(),
+        auto_reload=False,
     )
-    env.globals["url_for"] = lambda name, **params: url_builder(name, params)
+    env.globals["url_for"] = url_builder
     return env
 
 
-def ensure_output_dir(output: Path) -> None:
-    if output.exists():
+def _link_or_copy(src: str, dst: str) -> str:
+    """copytree copy_function: hard-link assets when possible, copy them otherwise."""
+    try:
+        if os.path.lexists(dst):
+            src_stat, dst_stat = os.stat(src), os.stat(dst)
+            # Already linked, or copied from this same version of the file
+            if os.path.samestat(src_stat, dst_stat) or (
+                src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+            ):
+                return dst
+            os.unlink(dst)
+        os.link(src, dst)
+    except OSError:
+        # Cross-device output, or a filesystem without hard links
+        shutil.copy2(src, dst)
+    return dst
+
+
+def ensure_output_dir(output: Path, clean: bool = True) -> None:
+    # An incremental build keeps earlier output; unchanged pages are skipped via the hash manifest
+    if clean and output.exists():
         shutil.rmtree(output)
     output.mkdir(parents=True, exist_ok=True)
-    (output / "posts").mkdir()
-    (output / "groups").mkdir()
-    (output / "daily").mkdir()
-    shutil.copytree(STATIC_DIR, output / "static", dirs_exist_ok=True)
+    (output / "posts").mkdir(exist_ok=True)
+    (output / "groups").mkdir(exist_ok=True)
+    (output / "daily").mkdir(exist_ok=True)
+    shutil.copytree(STATIC_DIR, output / "static", dirs_exist_ok=True, copy_function=_link_or_copy)
     (output / ".nojekyll").write_text("", encoding="utf-8")
 
 
-def render_template(env: Environment, template_name: str, destination: Path, context: Dict) -> None:
-    template = env.get_template(template_name)
-    html = template.render(context)
-    destination.parent.mkdir(parents=True, exist_ok=True)
-    destination.write_text(html, encoding="utf-8")
+# Output dirs this process already made; skips a mkdir per page (language variants share a dir)
+_created_dirs: Set[Path] = set()
+
+
+def render_template(
+    template: Template, destination: Path, context: Dict, previous_digest: Optional[str] = None
+) -> str:
+    """Render a page and return its content hash; the file is only rewritten when it changed."""
+    data = template.render(context).encode("utf-8")
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+    if digest == previous_digest and destination.exists():
+        return digest
+    parent = destination.parent
+    if parent not in _created_dirs:
+        parent.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(parent)
+    destination.write_bytes(data)
+    return digest
+
+
+def manifest_path(output: Path) -> Path:
+    key = hashlib.blake2b(str(output.resolve()).encode("utf-8"), digest_size=8).hexdigest()
+    return MANIFEST_DIR / f"{key}.json"
+
+
+def _is_page_key(key: object) -> bool:
+    if not isinstance(key, str) or not key:
+        return False
+    path = PurePosixPath(key)
+    return not path.is_absolute() and ".." not in path.parts
+
+
+def _generated_files(output: Path) -> Set[str]:
+    """Output-relative paths of every rendered page, i.e. everything but static/ and .nojekyll."""
+    files: Set[str] = set()
+    for root, dirs, names in os.walk(output):
+        if root == str(output):
+            dirs[:] = [name for name in dirs if name != "static"]
+            names = [name for name in names if name != ".nojekyll"]
+        relative = Path(root).relative_to(output)
+        files.update((relative / name).as_posix() for name in names)
+    return files
+
+
+def load_manifest(output: Path) -> Optional[Dict[str, str]]:
+    """Return the previous build's page hashes, or None when the output needs a clean build.
+
+    That is the case when there is no usable manifest, or when the output holds pages the
+    manifest doesn't know about (an older build, or one whose manifest could not be saved).
+    """
+    path = manifest_path(output)
+    try:
+        manifest = json.loads(path.read_bytes())
+        # Taken out for the duration of the build, so a build that can't save a new manifest
+        # never leaves an outdated one behind
+        path.unlink()
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict):
+        return None
+    # Keys are later joined onto the output and unlinked; never let one point outside it
+    if not all(_is_page_key(key) and isinstance(digest, str) for key, digest in manifest.items()):
+        return None
+    if not _generated_files(output) <= manifest.keys():
+        return None
+    return manifest
+
+
+def write_manifest(output: Path, previous: Dict[str, str], current: Dict[str, str]) -> None:
+    # Drop pages that are no longer generated, e.g. deleted posts
+    for stale in previous.keys() - current.keys():
+        stale_path = output / stale
+        stale_path.unlink(missing_ok=True)
+        try:
+            stale_path.parent.rmdir()
+        except OSError:
+            pass  # other language variants still live there
+    path = manifest_path(output)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(current, sort_keys=True, indent=0), encoding="utf-8")
+    except OSError:
+        pass  # read-only cache dir: the next build is a clean one
+
+
+RenderJob = Tuple[str, Path, Dict]
+
+# Per-process render state; Jinja templates and the url_for closure can't be pickled,
+# so each worker rebuilds them from base_url
+_worker_templates: Dict[str, Template] = {}
+_worker_context: Dict = {}  # keys shared by every page; each job only carries its own
+_worker_output: Optional[Path] = None
+_worker_hashes: Dict[str, str] = {}
+
+
+def _init_worker(base_url: str, output: Path, previous_hashes: Dict[str, str]) -> None:
+    global _worker_templates, _worker_context, _worker_output, _worker_hashes
+    url_builder = build_url_factory(base_url)
+    env = prepare_environment(url_builder)
+    # Resolve every page template once instead of on each render
+    _worker_templates = {name: env.get_template(name) for name in TEMPLATE_NAMES}
+    _worker_context = {
+        "request": StaticRequest(url_builder),
+        "comments_enabled": False,
+        "available_langs": i18n.SUPPORTED_LANGUAGES,
+    }
+    _worker_output = output
+    _worker_hashes = previous_hashes
+    _created_dirs.clear()
+
+
+def _render_job(job: RenderJob) -> Tuple[str, str]:
+    template_name, destination, context = job
+    key = destination.relative_to(_worker_output).as_posix()
+    digest = render_template(
+        _worker_templates[template_name],
+        destination,
+        {**_worker_context, **context},
+        _worker_hashes.get(key),
+    )
+    return key, digest
+
 
+def render_jobs(
+    jobs: List[RenderJob], base_url: str, workers: int, output: Path, previous_hashes: Dict[str, str]
+) -> Dict[str, str]:
+    """Render all pages, in a process pool when more than one worker is requested.
 
-def build_site(output_dir: Path, base_url: str) -> None:
+    Returns the new manifest: output-relative path -> content hash.
+    """
+    workers = max(1, min(workers, len(jobs)))
+    initargs = (base_url, output, previous_hashes)
+    if workers == 1:
+        _init_worker(*initargs)
+        return dict(_render_job(job) for job in jobs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        # Batch jobs so each worker round trip renders several pages
+        return dict(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def build_site(output_dir: Path, base_url: str, workers: int = 1) -> None:
     markdown_loader.refresh_cache()
     tag_collections.refresh()
-    url_builder = build_url_factory(base_url)
-    env = prepare_environment(url_builder)
 
-    request = StaticRequest(url_builder)
+    previous_hashes = load_manifest(output_dir)
+    ensure_output_dir(output_dir, clean=previous_hashes is None)
+    if previous_hashes is None:
+        previous_hashes = {}
+
+    jobs: List[RenderJob] = []
 
-    ensure_output_dir(output_dir)
+    def queue_render(template_name: str, destination: Path, context: Dict) -> None:
+        jobs.append((template_name, destination, context))
 
     posts = markdown_loader.list_posts(include_daily=True)
     groups = markdown_loader.list_groups()
     columns = markdown_loader.list_columns()
+
+    # Every post shows up on several listing pages per language; resolve its badges once
+    badges_by_post = {id(post): tag_collections.build_badges(post.tags, post.tags_lower) for post in posts}
+
+    def with_badges(selected):
+        return [(post, badges_by_post[id(post)]) for post in selected]
     
+    all_daily = markdown_loader.list_daily_posts()
+
     for lang in i18n.SUPPORTED_LANGUAGES:
-        regular_posts = [post for post in posts if not post.is_daily]
-        regular_posts = markdown_loader.filter_by_language(regular_posts, lang)
-        regular_with_badges = [(post, tag_collections.build_badges(post.tags)) for post in regular_posts]
-        all_daily = markdown_loader.list_daily_posts()
-        latest_daily = next((p for p in all_daily if p.lang == lang), None) or (all_daily[0] if all_daily else None)
-        daily_posts = markdown_loader.filter_by_language(all_daily, lang)
-        daily_with_badges = [(post, tag_collections.build_badges(post.tags)) for post in daily_posts]
+        # The loader keeps regular and daily posts bucketed by language already
+        regular_posts = markdown_loader.list_posts(lang=lang)
+        regular_with_badges = with_badges(regular_posts)
+        daily_posts = markdown_loader.list_daily_posts(lang=lang)
+        latest_daily = daily_posts[0] if daily_posts else (all_daily[0] if all_daily else None)
+        daily_with_badges = with_badges(daily_posts)
 
         output_path = output_dir / "index.html" if lang == i18n.DEFAULT_LANGUAGE else output_dir / f"index-{lang}.html"
-        render_template(
-            env,
+        queue_render(
             "index.html",
             output_path,
             {
-                "request": request,
                 "posts": regular_posts,
                 "posts_badges": regular_with_badges,
                 "groups": groups,
                 "latest_daily": latest_daily,
                 "columns": columns,
-                "comments_enabled": False,
                 "current_lang": lang,
-                "available_langs": i18n.SUPPORTED_LANGUAGES,
             },
         )
 
         daily_output = output_dir / "daily" / ("index.html" if lang == i18n.DEFAULT_LANGUAGE else f"index-{lang}.html")
-        render_template(
-            env,
+        queue_render(
             "daily.html",
             daily_output,
             {
-                "request": request,
                 "posts": daily_posts,
                 "posts_badges": daily_with_badges,
-                "comments_enabled": False,
                 "current_lang": lang,
-                "available_langs": i18n.SUPPORTED_LANGUAGES,
             },
         )
 
@@ -163,21 +330,14 @@ def build_site(output_dir: Path, base_url: str) -> None:
         for lang in i18n.SUPPORTED_LANGUAGES:
             group_posts = markdown_loader.filter_by_language(all_group_posts, lang)
             group_output = output_dir / "groups" / group.slug / ("index.html" if lang == i18n.DEFAULT_LANGUAGE else f"index-{lang}.html")
-            render_template(
-                env,
+            queue_render(
                 "group.html",
                 group_output,
                 {
-                    "request": request,
                     "group": group,
                     "posts": group_posts,
-                    "posts_badges": [
-                        (post, tag_collections.build_badges(post.tags))
-                        for post in group_posts
-                    ],
-                    "comments_enabled": False,
+                    "posts_badges": with_badges(group_posts),
                     "current_lang": lang,
-                    "available_langs": i18n.SUPPORTED_LANGUAGES,
                 },
             )
 
@@ -189,22 +349,15 @@ def build_site(output_dir: Path, base_url: str) -> None:
         for lang in i18n.SUPPORTED_LANGUAGES:
             column_posts = markdown_loader.filter_by_language(all_column_posts, lang)
             column_output = output_dir / "columns" / column / ("index.html" if lang == i18n.DEFAULT_LANGUAGE else f"index-{lang}.html")
-            render_template(
-                env,
+            queue_render(
                 "column.html",
                 column_output,
                 {
-                    "request": request,
                     "column": column,
                     "subcolumns": subcolumns,
                     "posts": column_posts,
-                    "posts_badges": [
-                        (post, tag_collections.build_badges(post.tags))
-                        for post in column_posts
-                    ],
-                    "comments_enabled": False,
+                    "posts_badges": with_badges(column_posts),
                     "current_lang": lang,
-                    "available_langs": i18n.SUPPORTED_LANGUAGES,
                 },
             )
         
@@ -214,102 +367,66 @@ def build_site(output_dir: Path, base_url: str) -> None:
             for lang in i18n.SUPPORTED_LANGUAGES:
                 subcolumn_posts = markdown_loader.filter_by_language(all_subcolumn_posts, lang)
                 subcolumn_output = output_dir / "columns" / column / subcolumn / ("index.html" if lang == i18n.DEFAULT_LANGUAGE else f"index-{lang}.html")
-                render_template(
-                    env,
+                queue_render(
                     "subcolumn.html",
                     subcolumn_output,
                     {
-                        "request": request,
                         "column": column,
                         "subcolumn": subcolumn,
                         "posts": subcolumn_posts,
-                        "posts_badges": [
-                            (post, tag_collections.build_badges(post.tags))
-                            for post in subcolumn_posts
-                        ],
-                        "comments_enabled": False,
+                        "posts_badges": with_badges(subcolumn_posts),
                         "current_lang": lang,
-                        "available_langs": i18n.SUPPORTED_LANGUAGES,
                     },
                 )
 
-    from app.services.tag_collections import _read_collections_file, TagCollection
-    collections_data = _read_collections_file()
     (output_dir / "collections").mkdir(exist_ok=True)
-    for entry in collections_data:
-        slug = str(entry.get("slug") or "").strip() or str(entry.get("name") or "").lower().replace(" ", "-")
-        name = str(entry.get("name") or "").strip()
-        if not name:
-            continue
-        color = entry.get("color")
-        if isinstance(color, str):
-            color = color.strip() or None
-        description = entry.get("description")
-        if isinstance(description, str):
-            description = description.strip() or None
-        collection = TagCollection(slug=slug, name=name, description=description, color=color)
-        tags = entry.get("tags") or []
-        if isinstance(tags, str):
-            tags = [tags]
-        matching_tags = [str(t).strip() for t in tags if isinstance(t, str) and t.strip()]
-        all_matching_posts = []
-        seen_slugs = set()
-        for tag in matching_tags:
-            for post in markdown_loader.list_posts_by_tag(tag):
-                if post.slug not in seen_slugs:
-                    all_matching_posts.append(post)
-                    seen_slugs.add(post.slug)
-        all_matching_posts.sort(key=lambda p: p.date, reverse=True)
+    # Same parsed collections the server uses; posts per tag come from the loader's tag index
+    for collection, matching_tags in tag_collections.list_collections():
+        slug = collection.slug
+        all_matching_posts = markdown_loader.list_posts_by_tags(matching_tags)
         for lang in i18n.SUPPORTED_LANGUAGES:
             filtered_posts = markdown_loader.filter_by_language(all_matching_posts, lang)
             collection_output = output_dir / "collections" / slug / ("index.html" if lang == i18n.DEFAULT_LANGUAGE else f"index-{lang}.html")
-            render_template(
-                env,
+            queue_render(
                 "collection.html",
                 collection_output,
                 {
-                    "request": request,
                     "collection": collection,
                     "posts": filtered_posts,
-                    "posts_badges": [
-                        (post, tag_collections.build_badges(post.tags))
-                        for post in filtered_posts
-                    ],
-                    "comments_enabled": False,
+                    "posts_badges": with_badges(filtered_posts),
                     "current_lang": lang,
-                    "available_langs": i18n.SUPPORTED_LANGUAGES,
                 },
             )
 
     for post in posts:
         post_output = output_dir / "posts" / post.slug / ("index.html" if post.lang == i18n.DEFAULT_LANGUAGE else f"index-{post.lang}.html")
-        render_template(
-            env,
+        queue_render(
             "post_detail.html",
             post_output,
             {
-                "request": request,
                 "post": post,
                 "comments": [],
                 "form_error": None,
-                "comments_enabled": False,
-                "tag_badges": tag_collections.build_badges(post.tags),
+                "tag_badges": badges_by_post[id(post)],
                 "current_lang": post.lang,
-                "available_langs": i18n.SUPPORTED_LANGUAGES,
             },
         )
 
+    hashes = render_jobs(jobs, base_url, workers, output_dir, previous_hashes)
+    write_manifest(output_dir, previous_hashes, hashes)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build static HTML snapshot for GitHub Pages.")
     parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="输出目录（默认: ./site）")
     parser.add_argument("--base-url", type=str, default="", help="GitHub Pages 子路径，例如 repo 名称。")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="并行渲染的进程数（默认: CPU 核数，1 为串行）")
     return parser.parse_args()
 
 
 def main() -> None:
     args = parse_args()
-    build_site(args.output.resolve(), args.base_url)
+    build_site(args.output.resolve(), args.base_url, args.jobs)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from jinja2 import Environment
+
+from scripts import build_static
+
+
+@pytest.fixture
+def manifest_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setattr(build_static, "MANIFEST_DIR", directory)
+    return directory
+
+
+def write_page(output, key, text="<p>page</p>"):
+    path = output / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_render_template_skips_unchanged_pages(tmp_path):
+    template = Environment().from_string("<p>{{ text }}</p>")
+    destination = tmp_path / "posts" / "a" / "index.html"
+    digest = build_static.render_template(template, destination, {"text": "hi"})
+
+    destination.write_text("touched", encoding="utf-8")
+    assert build_static.render_template(template, destination, {"text": "hi"}, digest) == digest
+    assert destination.read_text(encoding="utf-8") == "touched"
+
+    assert build_static.render_template(template, destination, {"text": "bye"}, digest) != digest
+    assert destination.read_text(encoding="utf-8") == "<p>bye</p>"
+
+
+def test_write_manifest_prunes_pages_no_longer_built(tmp_path, manifest_dir):
+    output = tmp_path / "site"
+    gone = write_page(output, "posts/gone/index.html")
+    variant = write_page(output, "posts/kept/index-en.html")
+    write_page(output, "posts/kept/index.html")
+    previous = {"posts/gone/index.html": "1", "posts/kept/index.html": "2", "posts/kept/index-en.html": "3"}
+
+    build_static.write_manifest(output, previous, {"posts/kept/index.html": "2"})
+
+    assert not gone.parent.exists()
+    assert not variant.exists()
+    assert (output / "posts" / "kept" / "index.html").exists()
+    assert json.loads(build_static.manifest_path(output).read_text()) == {"posts/kept/index.html": "2"}
+    assert build_static.load_manifest(output) == {"posts/kept/index.html": "2"}
+
+
+def test_load_manifest_requires_a_clean_build_when_untrusted(tmp_path, manifest_dir):
+    output = tmp_path / "site"
+    write_page(output, "index.html")
+    write_page(output, "static/styles.css")
+    assert build_static.load_manifest(output) is None
+
+    manifest_dir.mkdir()
+    path = build_static.manifest_path(output)
+    path.write_text(json.dumps({"index.html": "1", "../outside.html": "2"}), encoding="utf-8")
+    assert build_static.load_manifest(output) is None
+
+    path.write_text(json.dumps({"index.html": "1", str(tmp_path / "abs.html"): "2"}), encoding="utf-8")
+    assert build_static.load_manifest(output) is None
+
+    # A page the manifest doesn't account for, e.g. left by an older build
+    write_page(output, "posts/old/index.html")
+    path.write_text(json.dumps({"index.html": "1"}), encoding="utf-8")
+    assert build_static.load_manifest(output) is None
+    # The manifest is consumed while building, so a failed save can't leave it behind
+    assert not path.exists()
+
+    path.write_text(json.dumps({"index.html": "1", "posts/old/index.html": "2"}), encoding="utf-8")
+    assert build_static.load_manifest(output) == {"index.html": "1", "posts/old/index.html": "2"}
@@ -1,5 +1,6 @@
 import pytest
 from sqlmodel import Session, SQLModel, create_engine
+from app.repositories import comments as comment_repo
 from app.services import comment_service
 
 
@@ -24,3 +25,72 @@ def test_create_comment_enforces_non_empty_content():
             comment_service.create_comment(session, slug="example-post", nickname="", content="   ")
 
 
+def test_create_comments_bulk_returns_stored_rows():
+    items = [
+        {"post_slug": "example-post", "nickname": "Alice", "content": "First"},
+        {"post_slug": "example-post", "nickname": None, "content": "Second", "image_urls": ["/a.png"]},
+        {"post_slug": "other-post", "nickname": "Eve", "content": "Third"},
+    ]
+    with build_session() as session:
+        created = comment_repo.create_comments_bulk(session, items)
+        assert all(comment.id is not None for comment in created)
+        assert len({comment.id for comment in created}) == 3
+        assert [(comment.post_slug, comment.content) for comment in created] == [
+            (item["post_slug"], item["content"]) for item in items
+        ]
+        stored = comment_repo.list_comments(session, "example-post")
+        assert [(comment.id, comment.content, comment.image_urls) for comment in stored] == [
+            (created[0].id, "First", None),
+            (created[1].id, "Second", ["/a.png"]),
+        ]
+
+
+def test_list_comment_tree_nests_replies_under_parent():
+    with build_session() as session:
+        root = comment_service.create_comment(session, slug="example-post", nickname="Alice", content="Root")
+        comment_service.create_comment(
+            session, slug="example-post", nickname="Bob", content="Reply", parent_id=root.comment_id
+        )
+        comment_service.create_comment(session, slug="other-post", nickname="Eve", content="Elsewhere")
+        tree = comment_service.list_comment_tree(session, "example-post")
+        assert [view.content for view in tree] == ["Root"]
+        assert [child.content for child in tree[0].children] == ["Reply"]
+
+
+def test_create_comment_maps_check_constraint_violations(monkeypatch):
+    monkeypatch.setattr(comment_service, "MAX_CONTENT_LENGTH", 5000)
+    with build_session() as session:
+        with pytest.raises(ValueError, match="too long"):
+            comment_service.create_comment(session, slug="example-post", nickname="", content="x" * 1001)
+        assert comment_service.list_comment_tree(session, "example-post") == []
+
+
+def test_create_comment_rejects_invalid_image_before_saving_any(monkeypatch, tmp_path):
+    from io import BytesIO
+    from types import SimpleNamespace
+
+    upload_dir = tmp_path / "uploads"
+    monkeypatch.setattr(comment_service, "UPLOAD_DIR", upload_dir)
+    images = [
+        SimpleNamespace(filename="a.png", content_type="image/png", file=BytesIO(b"png")),
+        SimpleNamespace(filename="b.txt", content_type="text/plain", file=BytesIO(b"txt")),
+    ]
+    with build_session() as session:
+        with pytest.raises(ValueError, match="Invalid file type"):
+            comment_service.create_comment(session, slug="example-post", nickname="", content="Hi", images=images)
+    assert not upload_dir.exists()
+
+
+@pytest.mark.parametrize("spool_size", [1, 1 << 24])
+def test_save_upload_file_copies_spooled_and_in_memory_uploads(monkeypatch, tmp_path, spool_size):
+    from tempfile import SpooledTemporaryFile
+    from types import SimpleNamespace
+
+    monkeypatch.setattr(comment_service, "UPLOAD_DIR", tmp_path)
+    payload = bytes(range(256)) * 4096
+    spooled = SpooledTemporaryFile(max_size=spool_size)
+    spooled.write(payload)
+    spooled.seek(0)
+    url = comment_service.save_upload_file(SimpleNamespace(filename="photo.png", file=spooled))
+    saved = tmp_path / url.rsplit("/", 1)[-1]
+    assert saved.read_bytes() == payload
@@ -1,6 +1,20 @@
+import pytest
+
 from app.services import markdown_loader
 
 
+@pytest.fixture
+def content_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(markdown_loader, "CONTENT_DIR", tmp_path)
+    monkeypatch.setattr(markdown_loader, "_path_cache", {})
+    monkeypatch.setattr(markdown_loader, "_dir_cache", {})
+    monkeypatch.setattr(markdown_loader, "POST_CACHE_PATH", tmp_path / ".cache" / "posts.json")
+    monkeypatch.setattr(markdown_loader, "_disk_cache", None)
+    yield tmp_path
+    monkeypatch.undo()
+    markdown_loader.refresh_cache()
+
+
 def test_list_posts_excludes_daily():
     posts = markdown_loader.list_posts()
     assert posts, "Expected posts to be loaded"
@@ -23,3 +37,98 @@ def test_groups_are_loaded_with_counts():
     assert announcements.post_count >= 1
 
 
+def test_list_posts_by_tag_is_case_insensitive():
+    tagged = markdown_loader.list_posts_by_tag("INTRO")
+    assert tagged
+    assert all(any(t.lower() == "intro" for t in post.tags) for post in tagged)
+
+
+def test_list_posts_by_tags_lists_each_post_once(content_dir):
+    (content_dir / "old.md").write_text("---\ntitle: Old\ndate: 2024-01-01\ntags: [a, b]\n---\nx", encoding="utf-8")
+    (content_dir / "new.md").write_text("---\ntitle: New\ndate: 2024-02-01\ntags: [B]\n---\nx", encoding="utf-8")
+    markdown_loader.refresh_cache()
+    assert [post.slug for post in markdown_loader.list_posts_by_tags(["a", "b"])] == ["new", "old"]
+
+
+def test_list_posts_by_language_matches_filter():
+    for lang in ("en", "zh"):
+        expected = markdown_loader.filter_by_language(markdown_loader.list_posts(), lang)
+        assert markdown_loader.list_posts(lang=lang) == expected
+
+
+def test_refresh_cache_reparses_only_changed_files(content_dir, monkeypatch):
+    (content_dir / "first.md").write_text("---\ntitle: First\ndate: 2024-01-01\n---\nHello", encoding="utf-8")
+    (content_dir / "second.md").write_text("---\ntitle: Second\ndate: 2024-01-02\n---\nWorld", encoding="utf-8")
+    loaded = []
+    load_post = markdown_loader._load_post
+    monkeypatch.setattr(
+        markdown_loader, "_load_post", lambda path, *args: loaded.append(path.name) or load_post(path, *args)
+    )
+
+    markdown_loader.refresh_cache()
+    assert sorted(loaded) == ["first.md", "second.md"]
+
+    loaded.clear()
+    (content_dir / "second.md").write_text("---\ntitle: Second\ndate: 2024-01-02\n---\nWorld, again", encoding="utf-8")
+    markdown_loader.refresh_cache()
+    assert loaded == ["second.md"]
+    assert {post.slug for post in markdown_loader.list_posts()} == {"first", "second"}
+
+
+def test_disk_cache_skips_parsing_after_restart(content_dir, monkeypatch):
+    (content_dir / "cached.md").write_text(
+        "---\ntitle: Cached\ndate: 2024-01-01\ntags: [One, Two]\n---\nBody", encoding="utf-8"
+    )
+    markdown_loader.refresh_cache()
+    assert markdown_loader.POST_CACHE_PATH.exists()
+    original = markdown_loader.get_post("cached")
+
+    # Simulate a fresh process: in-memory caches are empty, the JSON cache is still on disk
+    monkeypatch.setattr(markdown_loader, "_path_cache", {})
+    monkeypatch.setattr(markdown_loader, "_dir_cache", {})
+    monkeypatch.setattr(markdown_loader, "_disk_cache", None)
+    parsed = []
+    parse_post = markdown_loader._parse_post
+    monkeypatch.setattr(
+        markdown_loader, "_parse_post", lambda path, *args: parsed.append(path.name) or parse_post(path, *args)
+    )
+    markdown_loader.refresh_cache()
+    assert parsed == []
+    assert markdown_loader.get_post("cached") == original
+
+
+def test_refresh_cache_picks_up_edited_preview_snippet(content_dir, monkeypatch):
+    monkeypatch.setattr(markdown_loader, "BASE_DIR", content_dir)
+    snippet = content_dir / "content" / "snippet.py"
+    snippet.parent.mkdir()
+    snippet.write_text("print('old')\n", encoding="utf-8")
+    (content_dir / "demo.md").write_text(
+        "---\ntitle: Demo\ndate: 2024-01-01\n---\n@content/snippet.py", encoding="utf-8"
+    )
+    markdown_loader.refresh_cache()
+    assert "old" in markdown_loader.get_post("demo").content_html
+
+    snippet.write_text("print('brand new')\n", encoding="utf-8")
+    markdown_loader.refresh_cache()
+    assert "brand new" in markdown_loader.get_post("demo").content_html
+
+    # A fresh process must not serve the old snippet from the disk cache either
+    snippet.write_text("print('after restart')\n", encoding="utf-8")
+    monkeypatch.setattr(markdown_loader, "_path_cache", {})
+    monkeypatch.setattr(markdown_loader, "_dir_cache", {})
+    monkeypatch.setattr(markdown_loader, "_disk_cache", None)
+    markdown_loader.refresh_cache()
+    assert "after restart" in markdown_loader.get_post("demo").content_html
+
+
+def test_refresh_cache_picks_up_added_and_removed_files(content_dir):
+    nested = content_dir / "notes"
+    nested.mkdir()
+    (nested / "first.md").write_text("---\ntitle: First\n---\nBody", encoding="utf-8")
+    markdown_loader.refresh_cache()
+    assert {post.slug for post in markdown_loader.list_posts()} == {"first"}
+
+    (nested / "second.md").write_text("---\ntitle: Second\n---\nBody", encoding="utf-8")
+    (nested / "first.md").unlink()
+    markdown_loader.refresh_cache()
+    assert {post.slug for post in markdown_loader.list_posts()} == {"second"}
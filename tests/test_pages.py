@@ -0,0 +1,63 @@
+import os
+
+import pytest
+from fastapi.responses import HTMLResponse
+from starlette.requests import Request
+
+from app.routers import pages
+from app.services import markdown_loader, tag_collections
+
+
+@pytest.fixture
+def collections_file(tmp_path, monkeypatch):
+    path = tmp_path / "tag_collections.yaml"
+    path.write_text("collections:\n  - name: First\n    tags: [python]\n", encoding="utf-8")
+    monkeypatch.setattr(tag_collections, "COLLECTIONS_PATHS", [path])
+    tag_collections.refresh()
+    yield path
+    monkeypatch.undo()
+    tag_collections.refresh()
+
+
+def build_request(path="/"):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+def counting_page():
+    calls = []
+
+    @pages.cached_html
+    def page(request, lang):
+        calls.append(lang)
+        return HTMLResponse(f"<p>{len(calls)}</p>")
+
+    return page, calls
+
+
+def test_cached_html_reuses_page_until_content_changes(collections_file, monkeypatch):
+    version = [1]
+    monkeypatch.setattr(markdown_loader, "cache_version", lambda: version[0])
+    page, calls = counting_page()
+
+    assert page(request=build_request(), lang="en").body == b"<p>1</p>"
+    assert page(request=build_request(), lang="en").body == b"<p>1</p>"
+    assert page(request=build_request(), lang="zh").body == b"<p>2</p>"
+    assert len(calls) == 2
+
+    version[0] += 1
+    assert page(request=build_request(), lang="en").body == b"<p>3</p>"
+
+    collections_file.write_text("collections:\n  - name: Renamed\n    tags: [python]\n", encoding="utf-8")
+    stat = collections_file.stat()
+    os.utime(collections_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert page(request=build_request(), lang="en").body == b"<p>4</p>"
+    assert tag_collections.build_badges(["python"])[0].label == "Renamed"
+
+
+def test_cached_html_is_bypassed_in_debug_mode(monkeypatch):
+    monkeypatch.setattr(pages, "DEBUG", True)
+    page, calls = counting_page()
+
+    page(request=build_request(), lang="en")
+    page(request=build_request(), lang="en")
+    assert len(calls) == 2
@@ -0,0 +1,19 @@
+import pytest
+
+from app.staticfiles import is_immutable
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["css/app.3f9a1c2e5b7d9f01.css", "js/main-0123456789abcdef0123.js", "uploads/comments/photo.png"],
+)
+def test_hashed_or_uploaded_files_are_immutable(path):
+    assert is_immutable(path)
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["img/screenshot-20240115.png", "img/logo-12345678.svg", "css/app.3f9a1c2e.css", "img/2024010112345678.png"],
+)
+def test_plain_and_date_stamped_files_are_not_immutable(path):
+    assert not is_immutable(path)
@@ -0,0 +1,23 @@
+import asyncio
+
+from app import templating
+
+
+def _collect(response):
+    async def consume():
+        return [chunk async for chunk in response.body_iterator]
+
+    return asyncio.run(consume())
+
+
+def test_stream_template_sends_few_large_chunks(monkeypatch):
+    template = templating.templates.env.from_string(
+        "{% for i in range(2000) %}<p>{{ i }}</p>{% endfor %}"
+    )
+    monkeypatch.setattr(templating.templates.env, "get_template", lambda name: template)
+
+    chunks = _collect(templating.stream_template("page.html", {}))
+
+    assert "".join(chunks) == template.render()
+    assert len(template.render()) > templating.STREAM_CHUNK_SIZE
+    assert len(chunks) <= len(template.render()) // templating.STREAM_CHUNK_SIZE + 1